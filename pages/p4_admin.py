@@ -1,8 +1,9 @@
 # pages/p4_admin.py
 import streamlit as st
 from utils.ui import set_logo_and_style, topbar_html
-from utils.data_io import add_course
-from utils.backblaze import upload_fileobj
+from utils.data_io import add_course, blob_stats
+from utils.thumbnails import make_derivatives_for_file
+from utils import metrics, upload_queue, warmup
 
 
 def app(user=None):
@@ -37,36 +38,25 @@ def app(user=None):
         thumbnail_url = ""
         pdf_url = ""
 
-        # Upload thumbnail (if provided)
+        # Stage uploads to local disk; B2 uploads happen in the background
         if thumbnail is not None:
             try:
-                filename = f"thumbnails/{thumbnail.name}"
-                # Streamlit's UploadedFile supports .read() and .seek()
-                url = upload_fileobj(thumbnail, filename)
-                if url:
-                    thumbnail_url = url
-                    st.success("Thumbnail uploaded.")
-                else:
-                    st.warning(
-                        "Thumbnail upload returned no URL; saved locally (or failed).")
+                thumbnail_url = upload_queue.stage_file(thumbnail, thumbnail.name)
+                # card-sized derivatives, so the original never reaches browsers
+                try:
+                    make_derivatives_for_file(thumbnail_url)
+                except Exception as e:
+                    st.warning(f"Thumbnail resize skipped: {e}")
             except Exception as e:
-                st.error(f"Thumbnail upload error: {e}")
+                st.error(f"Thumbnail save error: {e}")
 
-        # Upload PDF (if provided)
         if pdf_file is not None:
             try:
-                filename = f"pdfs/{pdf_file.name}"
-                url = upload_fileobj(pdf_file, filename)
-                if url:
-                    pdf_url = url
-                    st.success("PDF uploaded.")
-                else:
-                    st.warning(
-                        "PDF upload returned no URL; saved locally (or failed).")
+                pdf_url = upload_queue.stage_file(pdf_file, pdf_file.name)
             except Exception as e:
-                st.error(f"PDF upload error: {e}")
+                st.error(f"PDF save error: {e}")
 
-        # Save course record (thumbnail_url/pdf_url may be URLs or local paths)
+        # Save course record with the local paths; the worker swaps in URLs
         try:
             new_id = add_course(
                 title=title.strip(),
@@ -78,3 +68,92 @@ def app(user=None):
             st.success(f"Course added (id={new_id}).")
         except Exception as e:
             st.error(f"Failed to save course: {e}")
+            new_id = None
+
+        if new_id is not None:
+            try:
+                if thumbnail_url:
+                    upload_queue.enqueue(new_id, "thumbnail", thumbnail_url,
+                                         f"thumbnails/{thumbnail.name}")
+                if pdf_url:
+                    upload_queue.enqueue(new_id, "asset_path", pdf_url,
+                                         f"pdfs/{pdf_file.name}")
+                if thumbnail_url or pdf_url:
+                    st.info("Assets saved locally; uploading to cloud storage in the background.")
+            except Exception as e:
+                st.warning(f"Could not queue cloud upload (local copy kept): {e}")
+
+    # Upload queue status
+    st.markdown("---")
+    st.subheader("Background uploads")
+    upload_queue.start_worker()
+    status = upload_queue.queue_status()
+    counts = status["counts"]
+    st.caption(" · ".join(f"{k}: {v}" for k, v in counts.items()))
+    speed = status["throughput"]
+    if speed["transfers"] or speed["skipped"]:
+        st.caption(
+            f"Throughput: {speed['transfers']} transfers, {speed['bytes'] / 1e6:.1f} MB in "
+            f"{speed['seconds']:.1f} s"
+            + (f" ({speed['mb_per_s']:.2f} MB/s)" if speed["mb_per_s"] is not None else "")
+            + f" · {speed['skipped']} skipped as duplicates")
+    dedup = blob_stats()
+    st.caption(
+        f"Dedup: {dedup['blobs']} distinct files · "
+        f"{dedup['remote_hits']} transfers skipped, {dedup['misses']} uploaded"
+        + (f" (hit rate {dedup['hit_rate']:.0%})" if dedup["hit_rate"] is not None else "")
+        + f" · saved {dedup['transfer_bytes_saved'] / 1e6:.1f} MB upload, "
+        f"{dedup['disk_bytes_saved'] / 1e6:.1f} MB disk")
+    if status["jobs"]:
+        st.dataframe(
+            [{"course": j["course_id"], "field": j["column"], "status": j["status"],
+              "attempts": j["attempts"], "key": j["key"],
+              "MB": round((js.get("bytes") or 0) / 1e6, 2), "MB/s": js.get("mb_per_s"),
+              "dedup": js.get("dedup") or "", "error": j["error"] or ""}
+             for j, js in ((j, j.get("stats") or {}) for j in status["jobs"][:20])],
+            width="stretch", hide_index=True)
+    cols = st.columns(2)
+    if cols[0].button("Refresh", key="admin_queue_refresh"):
+        st.rerun()
+    if counts.get("failed") and cols[1].button("Retry failed", key="admin_queue_retry"):
+        upload_queue.retry_failed()
+        st.rerun()
+
+    # Timing spans (utils/metrics.py)
+    st.markdown("---")
+    st.subheader("Performance")
+    startup = warmup.report()
+    if startup:
+        background = startup["background_ms"]
+        st.caption(f"Warm start (ELEARN_WARMUP={startup['mode']}): {startup['total_ms']:.0f} ms"
+                   + (f" + {background:.0f} ms in background" if background is not None else "")
+                   + " · " + " · ".join(f"{k} {v:.0f} ms" for k, v in startup["steps"].items()))
+        for step, message in startup["errors"].items():
+            st.warning(f"Warm start step {step} failed: {message}")
+    if not metrics.ENABLED:
+        st.caption("Instrumentation is off (ELEARN_METRICS=0).")
+        return
+    last = st.session_state.get("last_rerun_timings")
+    if last:
+        st.caption(f"Previous rerun: {last['total_ms']:.1f} ms")
+        st.dataframe(
+            [{"span": name, "calls": v["count"], "ms": v["ms"]}
+             for name, v in last["spans"].items()],
+            width="stretch", hide_index=True)
+    snap = metrics.snapshot()
+    if snap:
+        st.caption(f"Rolling percentiles over the last {metrics.WINDOW} calls per span (this process)")
+        st.dataframe(
+            [dict(span=name, **row) for name, row in
+             sorted(snap.items(), key=lambda kv: -kv[1]["sum_ms"])],
+            width="stretch", hide_index=True)
+    cols = st.columns(3)
+    cols[0].download_button("Prometheus", data=metrics.to_prometheus(),
+                            file_name="elearn_metrics.prom", mime="text/plain",
+                            key="admin_metrics_prom")
+    cols[1].download_button("JSON", data=metrics.to_json(),
+                            file_name="elearn_metrics.json", mime="application/json",
+                            key="admin_metrics_json")
+    if cols[2].button("Reset", key="admin_metrics_reset"):
+        metrics.reset()
+        st.rerun()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# scripts/bench_b2_upload.py
+"""
+Benchmark utils/backblaze uploads against a local S3-compatible server
+(moto, `pip install "moto[server]"`), so no B2 account is needed.
+
+Compares:
+  - a new client per upload (the old behaviour) vs the cached shared client
+  - thumbnail then PDF serially vs upload_course_assets (concurrent)
+  - a large PDF at several TransferConfig max_concurrency values
+
+Uploads are content-addressed, so every upload gets a unique suffix to
+force a real transfer. Runs in a temporary directory, so data/blobs.json
+is never touched.
+
+Usage:
+  python scripts/bench_b2_upload.py
+  python scripts/bench_b2_upload.py --pdf-mb 64 --rounds 20
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import itertools
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import backblaze  # noqa: E402
+
+
+_serial = itertools.count()
+
+
+class Upload(io.BytesIO):
+    """BytesIO that looks like a Streamlit UploadedFile (name/type/size)."""
+
+    def __init__(self, data, name, type_):
+        # unique bytes per upload, or the blob index would skip the transfer
+        data += b"%d" % next(_serial)
+        super().__init__(data)
+        self.name, self.type, self.size = name, type_, len(data)
+
+
+def start_server():
+    from moto.server import ThreadedMotoServer
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f"http://{host}:{port}"
+
+
+def configure(endpoint, concurrency=None):
+    backblaze.B2_KEY_ID = backblaze.B2_APP_KEY = "testing"
+    backblaze.B2_BUCKET = "elearn-bench"
+    backblaze.B2_ENDPOINT = endpoint
+    backblaze.FALLBACK_LOCAL = False
+    if concurrency is not None:
+        backblaze.MAX_CONCURRENCY = concurrency
+    backblaze.reset_client()
+
+
+def timed(fn, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) / rounds
+
+
+def run(rounds, thumb_kb, pdf_mb, concurrencies):
+    server, endpoint = start_server()
+    try:
+        configure(endpoint)
+        backblaze._get_client().create_bucket(Bucket=backblaze.B2_BUCKET)
+        thumb = b"\xff" * (thumb_kb * 1024)
+        pdf = b"%PDF" * (pdf_mb * 256 * 1024)
+        report = {"endpoint": "moto", "rounds": rounds, "thumb_kb": thumb_kb, "pdf_mb": pdf_mb}
+
+        def upload_small():
+            assert backblaze.upload_fileobj(Upload(thumb, "t.png", "image/png"), "thumbnails/t.png")
+
+        def upload_small_fresh_client():
+            backblaze.reset_client()
+            upload_small()
+
+        report["small_upload_s"] = {
+            "new_client_each_time": round(timed(upload_small_fresh_client, rounds), 4),
+            "shared_client": round(timed(upload_small, rounds), 4),
+        }
+
+        def serial():
+            backblaze.upload_fileobj(Upload(thumb, "t.png", "image/png"), "thumbnails/t.png")
+            backblaze.upload_fileobj(Upload(pdf, "c.pdf", "application/pdf"), "pdfs/c.pdf")
+
+        def concurrent():
+            res = backblaze.upload_course_assets(
+                thumbnail=Upload(thumb, "t.png", "image/png"), thumbnail_key="thumbnails/t.png",
+                pdf=Upload(pdf, "c.pdf", "application/pdf"), pdf_key="pdfs/c.pdf")
+            assert res["thumbnail"] and res["pdf"]
+
+        pair_rounds = max(1, rounds // 5)
+        report["thumbnail_plus_pdf_s"] = {
+            "serial": round(timed(serial, pair_rounds), 4),
+            "upload_course_assets": round(timed(concurrent, pair_rounds), 4),
+        }
+
+        report["pdf_by_concurrency"] = []
+        for c in concurrencies:
+            configure(endpoint, concurrency=c)
+            stats = {}
+            backblaze.upload_fileobj(Upload(pdf, "c.pdf", "application/pdf"), "pdfs/c.pdf", stats)
+            report["pdf_by_concurrency"].append(
+                {"max_concurrency": c, "seconds": stats["seconds"], "mb_per_s": stats["mb_per_s"]})
+        report["multipart_threshold"] = backblaze.MULTIPART_THRESHOLD
+        report["multipart_chunksize"] = backblaze.MULTIPART_CHUNKSIZE
+        return report
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--thumb-kb", type=int, default=200)
+    parser.add_argument("--pdf-mb", type=int, default=32)
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated max_concurrency values")
+    args = parser.parse_args()
+    counts = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            report = run(args.rounds, args.thumb_kb, args.pdf_mb, counts)
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# scripts/bench_course_rows.py
+"""
+Benchmark row access and bulk column rewrites on large synthetic catalogs.
+
+For each size (default 10k and 100k courses) it times:
+  - a full pass over the catalog: DataFrame.iterrows vs to_dict('records')
+    vs data_io.course_records() (cold build, then warm per-version cache)
+  - one 12-card page: iloc slice + iterrows vs query_courses(as_records=True)
+  - rewriting the thumbnail of every 10th course by title: a per-row
+    iterrows/.at loop vs data_io.merge_courses_by_title (one vectorized write)
+
+Runs in a temporary directory, so data/ is never touched.
+
+Usage:
+  python scripts/bench_course_rows.py
+  python scripts/bench_course_rows.py --sizes 10000,100000,500000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_dataset import generate  # noqa: E402
+
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - t0) / repeat * 1000, 3)
+
+
+def bench(n):
+    from utils import data_io
+
+    generate("data", n, 1, 0, bcrypt_rounds=4)
+    data_io.invalidate_tables()
+    df = data_io.load_courses()
+    result = {"courses": n}
+
+    def full_iterrows():
+        for _, row in df.iterrows():
+            row.get("title")
+
+    def full_dicts():
+        for row in df.to_dict(orient="records"):
+            row.get("title")
+
+    def full_records():
+        for row in data_io.course_records():
+            row.title
+
+    result["full_pass_ms"] = {
+        "iterrows": timed(full_iterrows),
+        "to_dict_records": timed(full_dicts),
+        "course_records_cold": timed(full_records),
+        "course_records_warm": timed(full_records, repeat=5),
+    }
+
+    def page_iterrows():
+        for _, row in df.iloc[n // 2:n // 2 + 12].iterrows():
+            row.get("title")
+
+    def page_records():
+        rows, _ = data_io.query_courses(None, "Newest", n // 2, 12, as_records=True)
+        for row in rows:
+            row.title
+
+    result["page_of_12_ms"] = {
+        "iloc_iterrows": timed(page_iterrows, repeat=50),
+        "query_courses_records": timed(page_records, repeat=50),
+    }
+
+    mapping = {title: f"assets/thumbnails/new_{i}.jpg"
+               for i, title in enumerate(df["title"].tolist()[::10])}
+
+    def loop_update():
+        frame = df.copy()
+        for i, row in frame.iterrows():
+            title = str(row["title"]).strip()
+            if title in mapping:
+                frame.at[i, "thumbnail"] = mapping[title]
+
+    result["bulk_thumbnail_update_ms"] = {
+        "iterrows_at_loop_in_memory": timed(loop_update),
+        "merge_courses_by_title_incl_write": timed(
+            lambda: data_io.merge_courses_by_title(
+                {t: {"thumbnail": v} for t, v in mapping.items()})),
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated catalog sizes")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+                results.append(bench(n))
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# scripts/bench_fetch_thumbnails.py
+"""
+Benchmark scripts/fetch_thumbnails.py against a local HTTP server that adds
+artificial latency per request (a stand-in for a remote image CDN).
+
+Runs a cold fetch for each worker count, then a warm re-run (conditional
+requests -> 304) and prints wall times as JSON.
+
+Usage:
+  python scripts/bench_fetch_thumbnails.py
+  python scripts/bench_fetch_thumbnails.py --images 60 --latency 0.15 --size 200000
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fetch_thumbnails import fetch_all  # noqa: E402
+
+
+def make_handler(payloads, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = payloads.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = f'"{self.path.strip("/")}-{len(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            start = 0
+            rng = self.headers.get("Range")
+            if rng and rng.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+                start = int(rng[6:].split("-")[0] or 0)
+            self.send_response(206 if start else 200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            self.wfile.write(body[start:])
+
+    return Handler
+
+
+def run(images, latency, size, worker_counts):
+    payloads = {f"/img{i}.jpg": bytes([i % 256]) * size for i in range(images)}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(payloads, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    report = {"images": images, "latency_s": latency, "bytes_each": size, "runs": []}
+    try:
+        for workers in worker_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                tmp = Path(tmp)
+                manifest = tmp / "manifest.json"
+                jobs = [(p, base + p, tmp / p.lstrip("/")) for p in payloads]
+
+                t0 = time.perf_counter()
+                cold = fetch_all(jobs, workers=workers, manifest_path=manifest)
+                cold_s = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                warm = fetch_all(jobs, workers=workers, manifest_path=manifest)
+                warm_s = time.perf_counter() - t0
+
+                report["runs"].append({
+                    "workers": workers,
+                    "cold_s": round(cold_s, 3),
+                    "warm_s": round(warm_s, 3),
+                    "downloaded": sum(e["status"] == "downloaded" for e in cold.values()),
+                    "not_modified": sum(e["status"] == "not_modified" for e in warm.values()),
+                    "failed": sum(e["status"] == "failed" for e in cold.values()),
+                })
+    finally:
+        server.shutdown()
+    base_s = report["runs"][0]["cold_s"] if report["runs"] else 0
+    for r in report["runs"]:
+        r["speedup"] = round(base_s / r["cold_s"], 2) if r["cold_s"] else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per request")
+    parser.add_argument("--size", type=int, default=100_000, help="bytes per image")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="comma-separated worker counts")
+    args = parser.parse_args()
+
+    counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    report = run(args.images, args.latency, args.size, counts)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
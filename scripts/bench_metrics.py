@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# scripts/bench_metrics.py
+"""
+Overhead of the timing spans in utils/metrics.py.
+
+  - cost of one span (enabled vs ELEARN_METRICS=0) in a tight loop
+  - one rerun of the Courses page under AppTest, spans on vs off
+    (interleaved runs, median of each), plus the bound
+    spans per rerun x cost per span / rerun time
+
+Runs in a temporary directory, so data/ is never touched.
+
+Usage:
+  python scripts/bench_metrics.py
+  python scripts/bench_metrics.py --courses 200 --reruns 40
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from utils import metrics  # noqa: E402
+from generate_dataset import generate  # noqa: E402
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+from utils import metrics
+metrics.begin_rerun()
+from pages.p2_courses import app
+app({{"id": 1, "username": "bench", "role": "student"}})
+st.session_state["timings"] = metrics.end_rerun()
+"""
+
+
+def span_cost_ns(enabled, rounds):
+    metrics.set_enabled(enabled)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        with metrics.span("bench.empty"):
+            pass
+    return (time.perf_counter() - t0) / rounds * 1e9
+
+
+def rerun_ms(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(SCRIPT.format(root=str(ROOT)), default_timeout=60)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    times = {True: [], False: []}
+    spans = 0
+    for i in range(reruns * 2):
+        enabled = i % 2 == 0
+        metrics.set_enabled(enabled)
+        t0 = time.perf_counter()
+        at.run()
+        times[enabled].append((time.perf_counter() - t0) * 1000)
+        if enabled:
+            timings = at.session_state["timings"]
+            spans = sum(v["count"] for v in timings["spans"].values()) + 1
+    metrics.set_enabled(True)
+    return statistics.median(times[True]), statistics.median(times[False]), spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=60)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=200000)
+    args = parser.parse_args()
+
+    on_ns = span_cost_ns(True, args.rounds)
+    off_ns = span_cost_ns(False, args.rounds)
+    metrics.reset()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            generate("data", args.courses, 1, 1, bcrypt_rounds=4)
+            on_ms, off_ms, spans = rerun_ms(args.reruns)
+        finally:
+            os.chdir(cwd)
+
+    bound = spans * (on_ns - off_ns) / 1e6
+    print(json.dumps({
+        "span_ns": {"enabled": round(on_ns, 1), "disabled": round(off_ns, 1)},
+        "courses_rerun_ms": {"metrics_on": round(on_ms, 2), "metrics_off": round(off_ms, 2)},
+        "spans_per_rerun": spans,
+        "overhead_bound_pct": round(bound / off_ms * 100, 4) if off_ms else None,
+        "measured_delta_pct": round((on_ms - off_ms) / off_ms * 100, 2) if off_ms else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# scripts/bench_page_messages.py
+"""
+Count the websocket messages (deltas) and bytes one rerun of the Courses
+page sends, using Streamlit's AppTest harness on a synthetic catalog.
+
+Runs in a temporary directory, so data/ is never touched.
+
+Usage:
+  python scripts/bench_page_messages.py
+  python scripts/bench_page_messages.py --courses 60 --per-page 12
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_dataset import generate  # noqa: E402
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+st.session_state.setdefault("course_per_page", {per_page})
+from pages.p2_courses import app
+app({{"id": 1, "username": "bench", "role": "student"}})
+"""
+
+
+def measure(per_page, reruns):
+    from streamlit.testing.v1 import AppTest
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+
+    counts = {"messages": 0, "deltas": 0, "bytes": 0}
+    original = ScriptRunContext.enqueue
+
+    def counting_enqueue(self, msg):
+        counts["messages"] += 1
+        if msg.WhichOneof("type") == "delta":
+            counts["deltas"] += 1
+        counts["bytes"] += msg.ByteSize()
+        return original(self, msg)
+
+    ScriptRunContext.enqueue = counting_enqueue
+    try:
+        at = AppTest.from_string(SCRIPT.format(root=str(ROOT), per_page=per_page),
+                                 default_timeout=60)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+        for key in counts:
+            counts[key] = 0
+        for _ in range(reruns):
+            at.run()
+    finally:
+        ScriptRunContext.enqueue = original
+    return {k: round(v / reruns, 1) for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=30)
+    parser.add_argument("--per-page", type=int, default=12, choices=[6, 9, 12])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            generate("data", args.courses, 1, 1, bcrypt_rounds=4)
+            per_rerun = measure(args.per_page, args.reruns)
+        finally:
+            os.chdir(cwd)
+    print(json.dumps({"page": "courses", "cards": args.per_page,
+                      "per_rerun": per_rerun}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
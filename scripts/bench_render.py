@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# scripts/bench_render.py
+"""
+Micro-benchmark: HTML for one 12-card Courses page.
+
+  legacy  - per-rerun work before utils/render.py (placeholder SVG rebuilt
+            and URL-quoted, os.path.exists per card, card re-escaped)
+  cold    - utils.render.card_html with empty caches (first rerun)
+  warm    - utils.render.card_html on a later rerun (every card cached)
+
+Usage:
+  python scripts/bench_render.py
+  python scripts/bench_render.py --cards 12 --rounds 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import urllib.parse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import render  # noqa: E402
+from utils.ui import course_card_html  # noqa: E402
+
+
+def _legacy_placeholder(label="No image"):
+    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="600" height="360">
+      <rect width="100%" height="100%" fill="#F1F5F9"/>
+      <text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="#64748B" font-family="Arial, sans-serif" font-size="22">{label}</text>
+    </svg>'''
+    return "data:image/svg+xml;utf8," + urllib.parse.quote(svg)
+
+
+def _legacy_choose_thumb(thumb, title):
+    try:
+        if thumb and isinstance(thumb, str) and thumb.strip():
+            if os.path.exists(thumb):
+                return thumb
+            return thumb
+    except Exception:
+        pass
+    return _legacy_placeholder(label=(title[:30] or "No image"))
+
+
+def make_courses(n):
+    thumbs = ["", "assets/thumbnails/missing.jpg", "https://example.com/img.jpg", None]
+    return [{"id": i + 1, "title": f"Course {i + 1} & <friends>",
+             "description": "An introduction to things. " * 8,
+             "instructor": "Dr. Example", "thumbnail": thumbs[i % len(thumbs)]}
+            for i in range(n)]
+
+
+def legacy_page(courses):
+    out = []
+    for c in courses:
+        title = c.get("title") or "Untitled Course"
+        thumb = _legacy_choose_thumb(c.get("thumbnail"), title)
+        out.append(course_card_html(title, c.get("description") or "", thumb, ""))
+    return out
+
+
+def cached_page(courses):
+    return [render.card_html(c, "") for c in courses]
+
+
+def per_page_ms(fn, courses, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(courses)
+    return (time.perf_counter() - t0) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    courses = make_courses(args.cards)
+    assert legacy_page(courses) == cached_page(courses), "cached HTML differs"
+
+    legacy = per_page_ms(legacy_page, courses, args.rounds)
+    cold_rounds = max(1, args.rounds // 10)
+    t0 = time.perf_counter()
+    for _ in range(cold_rounds):
+        render._cards.clear()
+        render._exists.clear()
+        render.placeholder_dataurl.cache_clear()
+        cached_page(courses)
+    cold = (time.perf_counter() - t0) / cold_rounds * 1000
+    cached_page(courses)
+    warm = per_page_ms(cached_page, courses, args.rounds)
+
+    print(json.dumps({
+        "cards": args.cards,
+        "legacy_ms_per_page": round(legacy, 4),
+        "cold_ms_per_page": round(cold, 4),
+        "warm_ms_per_page": round(warm, 4),
+        "speedup_warm_vs_legacy": round(legacy / warm, 1) if warm else None,
+        "cache": render.cache_stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
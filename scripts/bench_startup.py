@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# scripts/bench_startup.py
+"""
+Cold start and first-request latency of streamlit_app.py with the warm
+start (utils/warmup.py) off, on (default: background indexes) and sync.
+
+For each mode a fresh Python process runs the app under Streamlit's
+AppTest harness on a generated dataset (scripts/generate_dataset.py) and
+records:
+  - import_ms: importing streamlit and the test harness
+  - first_request_ms: the first script run (warm start included when on)
+  - first_visit_ms: switching to each other page for the first time,
+    after a --think pause (a user reading the first page; default 1 s)
+  - warm_rerun_ms: a rerun once everything is loaded
+  - the warm start breakdown and whether boto3 got imported
+
+Runs in a temporary directory, so data/ is never touched.
+
+Usage:
+  python scripts/bench_startup.py
+  python scripts/bench_startup.py --courses 100000 --enrollments 1000000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+START = time.perf_counter()
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PAGE_LABELS = ["p2 courses", "p3 my courses", "p4 admin"]
+
+
+def child():
+    """One measured process (cwd = the dataset directory)."""
+    from streamlit.testing.v1 import AppTest
+
+    result = {"import_ms": round((time.perf_counter() - START) * 1000, 1)}
+    at = AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=300)
+    at.session_state["user"] = {"id": 1, "username": "user1", "role": "admin"}
+    at.session_state["role"] = "admin"
+
+    t0 = time.perf_counter()
+    at.run()
+    result["first_request_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    time.sleep(float(os.environ["BENCH_THINK"]))
+    result["first_visit_ms"] = {}
+    for label in PAGE_LABELS:
+        t0 = time.perf_counter()
+        at.sidebar.selectbox(key="nav_select").select(label).run()
+        result["first_visit_ms"][label] = round((time.perf_counter() - t0) * 1000, 1)
+    at.sidebar.selectbox(key="nav_select").select("p1 home").run()
+    t0 = time.perf_counter()
+    at.run()
+    result["warm_rerun_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    from utils import warmup
+    result["warm_start"] = warmup.report()
+    result["boto3_imported"] = "boto3" in sys.modules
+    print(json.dumps(result))
+
+
+def measure(mode, workdir, think):
+    env = dict(os.environ, ELEARN_WARMUP=mode, BENCH_THINK=str(think))
+    out = subprocess.run([sys.executable, __file__, "--child"], cwd=workdir, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--enrollments", type=int, default=200000)
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="seconds between the first request and the page switches")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from generate_dataset import generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(Path(tmp) / "data", args.courses, args.users, args.enrollments, bcrypt_rounds=4)
+        report = {"courses": args.courses, "users": args.users, "enrollments": args.enrollments,
+                  "think_s": args.think}
+        for mode, key in (("0", "warm_start_off"), ("1", "warm_start_on"),
+                          ("sync", "warm_start_sync")):
+            report[key] = measure(mode, tmp, args.think)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# scripts/bench_storage.py
+"""
+Cold-load cost of the tables with the csv and arrow backends.
+
+For each size it generates a dataset (scripts/generate_dataset.py: N
+courses, N users, 10 x N enrollments), converts it to Arrow IPC and times,
+per backend:
+  - a full load of every table (pd.read_csv vs memory-mapped IPC)
+  - the search projection (id, title, instructor, description)
+  - the enrollment pairs projection (user_id, course_id)
+and records the dtypes each backend hands to the app.
+
+Runs in a temporary directory, so data/ is never touched.
+
+Usage:
+  python scripts/bench_storage.py
+  python scripts/bench_storage.py --sizes 10000,100000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_dataset import generate  # noqa: E402
+
+
+def best_ms(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return round(best, 2)
+
+
+def bench(n, repeat):
+    from utils import data_io
+    import convert_to_arrow
+
+    generate("data", n, n, n * 10, bcrypt_rounds=4)
+    sys.argv = ["convert_to_arrow.py", "--force"]
+    convert_to_arrow.main()
+
+    result = {"courses": n, "users": n, "enrollments": n * 10}
+    for backend in ("csv", "arrow"):
+        data_io.set_storage_backend(backend)
+
+        def cold(fn):
+            def run():
+                data_io.invalidate_tables()
+                fn()
+            return best_ms(run, repeat)
+
+        result[backend] = {
+            "full_load_ms": {name: cold(lambda name=name: data_io._load_table(name))
+                             for name in ("courses", "users", "enrollments")},
+            "search_columns_ms": cold(lambda: data_io.load_columns(
+                "courses", data_io.SEARCH_COLUMNS)),
+            "enrollment_pairs_ms": cold(lambda: data_io.load_columns(
+                "enrollments", ("user_id", "course_id"))),
+            "dtypes": {c: str(t) for c, t in data_io.load_enrollments().dtypes.items()},
+            "file_bytes": sum(os.path.getsize(data_io._table_path(t))
+                              for t in ("courses", "users", "enrollments")),
+        }
+    data_io.set_storage_backend("csv")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated course/user counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+                results.append(bench(n, args.repeat))
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
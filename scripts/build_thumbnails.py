@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# scripts/build_thumbnails.py
+"""
+Build card-sized thumbnail derivatives for every existing course.
+
+Local thumbnails are read from disk; URL thumbnails are downloaded once.
+Derivatives land in static/thumbs/ (see utils/thumbnails.py) and a running
+app picks up the new index entries within a few seconds, no restart needed.
+
+Usage:
+  python scripts/build_thumbnails.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.data_io import load_courses  # noqa: E402
+from utils import thumbnails  # noqa: E402
+
+def _read_source(thumb):
+    if Path(thumb).exists():
+        return Path(thumb).read_bytes()
+    if thumb.startswith(("http://", "https://")):
+        return thumbnails.fetch_remote(thumb)
+    return None
+
+
+def main():
+    courses = load_courses()
+    if courses.empty or "thumbnail" not in courses.columns:
+        print("No courses with thumbnails.")
+        return
+
+    thumbs = sorted({t for t in courses["thumbnail"].tolist()
+                     if isinstance(t, str) and t.strip()})
+    done = failed = 0
+    original_bytes = derived_bytes = 0
+    for thumb in thumbs:
+        try:
+            data = _read_source(thumb)
+            if data is None:
+                print("Skipping (not found):", thumb)
+                failed += 1
+                continue
+            paths = thumbnails.make_derivatives(data, source=thumb)
+            small = paths[min(paths)].stat().st_size
+            original_bytes += len(data)
+            derived_bytes += small
+            print(f"OK {thumb}: {len(data) // 1024} KB -> {small // 1024} KB")
+            done += 1
+        except Exception as e:
+            print("Failed:", thumb, "->", e)
+            failed += 1
+
+    print(f"Done: {done} built, {failed} failed.")
+    if original_bytes:
+        print(f"Card image weight: {original_bytes // 1024} KB originals -> "
+              f"{derived_bytes // 1024} KB derivatives "
+              f"({100 * derived_bytes / original_bytes:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# scripts/convert_to_arrow.py
+"""
+Convert data/courses.csv, users.csv and enrollments.csv into the typed
+Arrow IPC files used when ELEARN_STORAGE=arrow (data/<table>.arrow), or
+back to CSV with --to-csv.
+
+Rows whose id columns are blank or not integers (e.g. a torn append) are
+dropped and counted; the CSVs themselves are left untouched.
+
+Usage:
+  python scripts/convert_to_arrow.py            # refuses to replace existing .arrow files
+  python scripts/convert_to_arrow.py --force
+  python scripts/convert_to_arrow.py --to-csv --force
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from utils import data_io, arrow_store, write_coordinator  # noqa: E402
+
+CSV_FILES = {'courses': data_io.COURSES, 'users': data_io.USERS,
+             'enrollments': data_io.ENROLLMENTS}
+
+
+def clean(name, df):
+    """Drop rows whose int64 columns don't parse; return (frame, dropped)."""
+    schema = arrow_store.SCHEMAS[name]
+    int_cols = [f.name for f in schema if f.type == 'int64' and f.name in df.columns]
+    if df.empty or not int_cols:
+        return df, 0
+    parsed = df[int_cols].apply(pd.to_numeric, errors='coerce')
+    ok = parsed.notna().all(axis=1) & (parsed % 1 == 0).all(axis=1)
+    df = df[ok].copy()
+    df[int_cols] = parsed[ok].astype('int64')
+    return df, int((~ok).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to-csv", action="store_true",
+                        help="write the CSVs from the .arrow files instead")
+    parser.add_argument("--force", action="store_true",
+                        help="overwrite existing target files")
+    args = parser.parse_args()
+
+    if args.to_csv:
+        targets = CSV_FILES
+    else:
+        targets = data_io.ARROW_FILES
+    # header-only / empty tables (e.g. created by a first app start) may be replaced
+    existing = [str(p) for p in targets.values()
+                if p.exists() and (args.to_csv or len(arrow_store.read_frame(p, ['id'])))]
+    if existing and not args.force:
+        print(f"{', '.join(existing)} already exist; use --force to replace them.")
+        sys.exit(1)
+
+    for name in ('courses', 'users', 'enrollments'):
+        if args.to_csv:
+            src = data_io.ARROW_FILES[name]
+            if not src.exists():
+                print(f"Skipped {name}: {src} not found")
+                continue
+            df = arrow_store.read_frame(src)
+            write_coordinator.atomic_write_csv(CSV_FILES[name], df)
+            print(f"Wrote {len(df)} {name} to {CSV_FILES[name]}")
+            continue
+        df, dropped = clean(name, data_io._read_csv_safe(CSV_FILES[name]))
+        arrow_store.write_frame(data_io.ARROW_FILES[name], name, df)
+        note = f" ({dropped} malformed rows dropped)" if dropped else ""
+        print(f"Converted {len(df)} {name} to {data_io.ARROW_FILES[name]}{note}")
+    if not args.to_csv:
+        print("Done. Start the app with ELEARN_STORAGE=arrow to use the .arrow files")
+
+
+if __name__ == "__main__":
+    main()
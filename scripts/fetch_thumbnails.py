@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# scripts/fetch_thumbnails.py
+"""
+Bulk, parallel, resumable thumbnail fetcher.
+
+- downloads run on a bounded thread pool sharing one requests.Session
+  (keep-alive connection pool sized to the worker count)
+- bodies are streamed to "<file>.part" and atomically renamed when complete
+- ETag / Last-Modified from the previous run are sent as conditional
+  headers (304 = unchanged), and an interrupted ".part" is resumed with a
+  Range request
+- results go to a JSON manifest, and data/courses.csv is updated once at
+  the end (one atomic write through utils.data_io)
+
+Usage:
+  python scripts/fetch_thumbnails.py                       # scripts/image_urls.json
+  python scripts/fetch_thumbnails.py --map my_urls.json --workers 16
+  python scripts/fetch_thumbnails.py --no-csv              # download only
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROOT = Path('.')
+THUMB_DIR = ROOT / 'assets' / 'thumbnails'
+JSON_MAP = ROOT / 'scripts' / 'image_urls.json'
+MANIFEST = THUMB_DIR / 'manifest.json'
+COURSES_CSV = ROOT / 'data' / 'courses.csv'
+BACKUP_DIR = ROOT / 'data' / 'backups'
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (E-Learning Streamlit Project)"
+}
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 20
+
+
+def filename_from_url(url):
+    parsed = urlparse(url)
+    name = Path(parsed.path).name
+    if not name:
+        name = parsed.netloc.replace('.', '_')
+    return name.split('?')[0]
+
+
+def make_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def load_json(path):
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+
+# -------------------------
+# Single download
+# -------------------------
+
+
+def fetch_one(session, url, dest, previous=None):
+    """
+    Download url to dest. Returns a manifest entry dict with status
+    'downloaded', 'resumed', 'not_modified', 'exists' or 'failed'.
+    """
+    dest = Path(dest)
+    part = dest.with_name(dest.name + '.part')
+    previous = previous or {}
+    entry = {"url": url, "file": str(dest.as_posix()), "status": "failed",
+             "etag": previous.get("etag"), "last_modified": previous.get("last_modified"),
+             "bytes": 0, "seconds": 0.0, "error": None}
+    t0 = time.perf_counter()
+    headers = {}
+    offset = part.stat().st_size if part.exists() else 0
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if entry["etag"] or entry["last_modified"]:
+            headers["If-Range"] = entry["etag"] or entry["last_modified"]
+    elif dest.exists():
+        if not (entry["etag"] or entry["last_modified"]):
+            # nothing to revalidate against; keep the existing file
+            entry["status"] = "exists"
+            return entry
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        with session.get(url, headers=headers, timeout=TIMEOUT, stream=True) as resp:
+            if resp.status_code == 304:
+                entry["status"] = "not_modified"
+                return entry
+            resp.raise_for_status()
+            resumed = resp.status_code == 206 and offset > 0
+            mode = "ab" if resumed else "wb"
+            written = 0
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with open(part, mode) as f:
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+            part.replace(dest)
+            entry["etag"] = resp.headers.get("ETag") or entry["etag"]
+            entry["last_modified"] = resp.headers.get("Last-Modified") or entry["last_modified"]
+            entry["bytes"] = written
+            entry["status"] = "resumed" if resumed else "downloaded"
+            return entry
+    except Exception as e:
+        # keep the .part file so the next run can resume it
+        entry["error"] = str(e)
+        return entry
+    finally:
+        entry["seconds"] = round(time.perf_counter() - t0, 4)
+
+# -------------------------
+# Bulk fetch
+# -------------------------
+
+
+def fetch_all(jobs, workers=8, manifest_path=MANIFEST, session=None):
+    """
+    jobs: iterable of (key, url, dest path). Returns {key: manifest entry}
+    and writes the manifest (keyed by URL) to manifest_path.
+    """
+    jobs = list(jobs)
+    workers = max(1, int(workers))
+    manifest = load_json(manifest_path) if manifest_path else {}
+    own_session = session is None
+    session = session or make_session(workers)
+    lock = threading.Lock()
+    results = {}
+
+    def run(job):
+        key, url, dest = job
+        entry = fetch_one(session, url, dest, manifest.get(url))
+        with lock:
+            results[key] = entry
+            print(f"{entry['status']:>12}  {dest}" +
+                  (f"  ({entry['error']})" if entry['error'] else ""))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, jobs))
+    finally:
+        if own_session:
+            session.close()
+
+    if manifest_path:
+        for entry in results.values():
+            manifest[entry["url"]] = entry
+        from utils.write_coordinator import atomic_write_text
+        atomic_write_text(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    return results
+
+
+def backup_csv():
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    bak = BACKUP_DIR / f"courses.csv.bak.{ts}"
+    shutil.copy2(COURSES_CSV, bak)
+    print("Backup created:", bak)
+    return bak
+
+
+def update_csv(results):
+    """Point each successfully fetched course title at its local file (one write)."""
+    from utils.data_io import update_courses_by_title
+    mapping = {title: e["file"] for title, e in results.items() if e["status"] != "failed"}
+    if not mapping or not COURSES_CSV.exists():
+        print("No CSV rows to update.")
+        return 0
+    backup_csv()
+    changed = update_courses_by_title('thumbnail', mapping)
+    print(f"Updated {changed} rows in {COURSES_CSV}")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--map", default=str(JSON_MAP),
+                        help="JSON file of course title -> image URL (default: %(default)s)")
+    parser.add_argument("--dest", default=str(THUMB_DIR), help="download directory")
+    parser.add_argument("--workers", type=int, default=8, help="parallel downloads")
+    parser.add_argument("--manifest", default=str(MANIFEST), help="results manifest path")
+    parser.add_argument("--no-csv", action="store_true", help="don't update courses.csv")
+    args = parser.parse_args()
+
+    mapping = load_json(args.map)
+    if not mapping:
+        print("No mapping found in", args.map)
+        return
+    dest_dir = Path(args.dest)
+    jobs = [(title, url, dest_dir / filename_from_url(url))
+            for title, url in mapping.items() if url]
+
+    t0 = time.perf_counter()
+    results = fetch_all(jobs, workers=args.workers, manifest_path=args.manifest)
+    elapsed = time.perf_counter() - t0
+    failed = sum(1 for e in results.values() if e["status"] == "failed")
+    print(f"Fetched {len(results) - failed}/{len(results)} in {elapsed:.2f}s "
+          f"with {args.workers} workers. Manifest: {args.manifest}")
+
+    if not args.no_csv:
+        update_csv(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# scripts/generate_dataset.py
+"""
+Generate synthetic courses.csv, users.csv and enrollments.csv at scale.
+
+The files use the same schema as data/*.csv and are streamed to disk in
+chunks, so memory stays flat (one array of course weights) even for
+millions of enrollments. The output is deterministic: the same arguments
+and --seed produce byte-identical files.
+
+  - courses: titles/descriptions from topic templates; thumbnails and PDFs
+    are a realistic mix of content-addressed B2 URLs, local paths,
+    remote images and blanks
+  - users: the first --admins ids are admins, the rest students, all
+    named user<id> and sharing one bcrypt hash of --password
+  - enrollments: course popularity follows a Zipf law (exponent --zipf)
+    over a seeded shuffle of the course ids; how many courses each user
+    takes follows a flatter Zipf (--user-zipf). No (user, course) pair
+    repeats. Rows are written grouped by user.
+
+Usage:
+  python scripts/generate_dataset.py --out-dir /tmp/big --courses 100000 --users 200000 --enrollments 2000000
+  python scripts/generate_dataset.py --force     # overwrite data/*.csv (small defaults)
+"""
+
+import sys
+import csv
+import time
+import random
+import hashlib
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CHUNK_ROWS = 50000
+B2_BASE = "https://s3.us-east-005.backblazeb2.com/elearn-assets"
+BCRYPT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+TOPICS = ["Python", "Data Science", "Machine Learning", "Web Development", "Statistics",
+          "Cloud Computing", "Databases", "Networking", "Cyber Security", "Algorithms",
+          "Environmental Studies", "Digital Marketing", "Graphic Design", "Linear Algebra",
+          "Research Methodology", "Project Management", "Embedded Systems", "Economics"]
+LEVELS = ["Introduction to", "Foundations of", "Applied", "Advanced", "Hands-on", "Practical"]
+FOCUS = ["Core Concepts", "Real-World Projects", "Lab", "Crash Course", "Bootcamp",
+         "Theory and Practice", "Case Studies", "for Beginners", "Masterclass"]
+SKILLS = ["problem solving", "visualization", "deployment", "testing", "modelling",
+          "data cleaning", "automation", "design thinking", "performance tuning",
+          "academic writing", "teamwork", "optimization"]
+FIRST = ["Asha", "Ravi", "Meera", "John", "Li", "Fatima", "Carlos", "Anna", "Kenji",
+         "Priya", "Omar", "Sara", "Mahesh", "Elena", "David", "Nia"]
+LAST = ["Sharma", "Kumar", "Smith", "Chen", "Garcia", "Ivanova", "Sato", "Okafor",
+        "Rao", "Müller", "Haddad", "Silva", "Nair", "Brown"]
+
+COURSE_COLUMNS = ["id", "title", "description", "instructor", "thumbnail", "asset_path"]
+USER_COLUMNS = ["id", "username", "password", "role"]
+ENROLLMENT_COLUMNS = ["id", "user_id", "course_id"]
+
+# -------------------------
+# Rows
+# -------------------------
+
+
+def _digest(seed, *parts):
+    return hashlib.sha256(":".join(map(str, (seed,) + parts)).encode()).hexdigest()
+
+
+def _thumbnail(rng, seed, cid):
+    roll = rng.random()
+    if roll < 0.45:
+        return f"{B2_BASE}/thumbnails/{_digest(seed, cid, 'thumb')}.jpg"
+    if roll < 0.70:
+        return f"assets/thumbnails/course_{cid}.jpg"
+    if roll < 0.90:
+        return f"https://picsum.photos/seed/course{cid}/600/360"
+    return ""
+
+
+def _asset(rng, seed, cid):
+    roll = rng.random()
+    if roll < 0.60:
+        return f"{B2_BASE}/pdfs/{_digest(seed, cid, 'pdf')}.pdf"
+    if roll < 0.75:
+        return f"assets/uploads/{_digest(seed, cid, 'pdf')}.pdf"
+    return ""
+
+
+def course_rows(n, seed):
+    rng = random.Random(f"{seed}:courses")
+    instructors = [f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+                   for _ in range(max(1, n // 20))]
+    for cid in range(1, n + 1):
+        topic = rng.choice(TOPICS)
+        skills = rng.sample(SKILLS, 2)
+        title = f"{rng.choice(LEVELS)} {topic}: {rng.choice(FOCUS)} {cid}"
+        description = (f"A {rng.choice(['4', '6', '8', '10', '12'])}-week course on "
+                       f"{topic.lower()} with a focus on {skills[0]} and {skills[1]}. "
+                       f"Includes {rng.randint(2, 12)} graded exercises.")
+        yield (cid, title, description, rng.choice(instructors),
+               _thumbnail(rng, seed, cid), _asset(rng, seed, cid))
+
+
+def password_hash(password, seed, rounds):
+    """bcrypt hash of password with a salt derived from seed (reproducible output)."""
+    import bcrypt
+
+    rng = random.Random(f"{seed}:salt")
+    # the 22nd salt character only carries 2 bits; keep the unused bits zero
+    salt = "".join(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + rng.choice(".Oeu")
+    return bcrypt.hashpw(password.encode("utf-8"),
+                         f"$2b${rounds:02d}${salt}".encode("ascii")).decode("ascii")
+
+
+def user_rows(n, admins, hashed):
+    for uid in range(1, n + 1):
+        yield (uid, f"user{uid}", hashed, "admin" if uid <= admins else "student")
+
+
+def _zipf_cdf(n, s):
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** s
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def enrollment_rows(users, courses, total, seed, zipf, user_zipf):
+    """
+    Yield (id, user_id, course_id) with Zipf course popularity and no
+    repeated (user, course) pair. Memory is O(courses + users).
+    """
+    gen = np.random.default_rng(seed)
+    course_cdf = _zipf_cdf(courses, zipf)
+    course_ids = gen.permutation(courses) + 1            # popularity rank -> course id
+    activity = 1.0 / np.arange(1, users + 1, dtype=np.float64) ** user_zipf
+    activity = activity[gen.permutation(users)]          # user id -> weight
+    expected = np.cumsum(activity / activity.sum() * total)
+
+    eid = 1
+    assigned = 0
+    for uid in range(1, users + 1):
+        # systematic rounding: per-user counts add up to exactly `total`
+        k = min(int(expected[uid - 1] + 0.5) - assigned, courses)
+        assigned += k
+        if k <= 0:
+            continue
+        if k > courses // 2:
+            picked = gen.choice(course_ids, size=k, replace=False,
+                                p=np.diff(course_cdf, prepend=0.0))
+        else:
+            chosen = {}
+            while len(chosen) < k:
+                ranks = np.searchsorted(course_cdf, gen.random(k - len(chosen) + 8))
+                for r in np.minimum(ranks, courses - 1).tolist():
+                    chosen.setdefault(r, None)
+                    if len(chosen) == k:
+                        break
+            picked = course_ids[list(chosen)]
+        for cid in picked.tolist():
+            yield (eid, uid, cid)
+            eid += 1
+
+# -------------------------
+# Writing
+# -------------------------
+
+
+def write_csv(path, columns, rows):
+    """Stream rows to path in CHUNK_ROWS batches; return the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= CHUNK_ROWS:
+                writer.writerows(batch)
+                count += len(batch)
+                batch.clear()
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+def generate(out_dir, courses, users, enrollments, seed=42, zipf=1.07, user_zipf=0.6,
+             password="password123", bcrypt_rounds=12, admins=1):
+    """Write the three CSVs into out_dir; return {file name: rows written}."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    hashed = password_hash(password, seed, bcrypt_rounds)
+    return {
+        "courses.csv": write_csv(out_dir / "courses.csv", COURSE_COLUMNS,
+                                 course_rows(courses, seed)),
+        "users.csv": write_csv(out_dir / "users.csv", USER_COLUMNS,
+                               user_rows(users, admins, hashed)),
+        "enrollments.csv": write_csv(out_dir / "enrollments.csv", ENROLLMENT_COLUMNS,
+                                     enrollment_rows(users, courses, enrollments,
+                                                     seed, zipf, user_zipf)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out-dir", default="data")
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--enrollments", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--zipf", type=float, default=1.07,
+                        help="course popularity exponent (default: %(default)s)")
+    parser.add_argument("--user-zipf", type=float, default=0.6,
+                        help="user activity exponent (default: %(default)s)")
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--password", default="password123",
+                        help="password of every generated user (default: %(default)s)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--force", action="store_true",
+                        help="overwrite existing CSVs in --out-dir")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    existing = [p.name for p in (out_dir / n for n in ("courses.csv", "users.csv", "enrollments.csv"))
+                if p.exists() and p.stat().st_size > 0]
+    if existing and not args.force:
+        print(f"{out_dir} already has {', '.join(existing)}; use --force to overwrite.")
+        sys.exit(1)
+    if args.courses < 1 or args.users < 1:
+        parser.error("--courses and --users must be at least 1")
+
+    t0 = time.perf_counter()
+    counts = generate(out_dir, args.courses, args.users, args.enrollments, seed=args.seed,
+                      zipf=args.zipf, user_zipf=args.user_zipf, password=args.password,
+                      bcrypt_rounds=args.bcrypt_rounds, admins=args.admins)
+    for name, n in counts.items():
+        print(f"Wrote {n} rows to {out_dir / name}")
+    print(f"Done in {time.perf_counter() - t0:.1f}s (seed {args.seed}). "
+          f"Log in as user1 / {args.password}.")
+
+
+if __name__ == "__main__":
+    main()
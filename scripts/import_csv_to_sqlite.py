@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# scripts/import_csv_to_sqlite.py
+"""
+One-shot import of data/courses.csv, users.csv and enrollments.csv into
+the SQLite database used when ELEARN_STORAGE=sqlite.
+
+Usage:
+  python scripts/import_csv_to_sqlite.py            # refuses a non-empty DB
+  python scripts/import_csv_to_sqlite.py --force    # replace DB contents
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import data_io  # noqa: E402
+from utils.sqlite_store import SQLiteStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=str(data_io.SQLITE_DB),
+                        help="SQLite database path (default: %(default)s)")
+    parser.add_argument("--force", action="store_true",
+                        help="overwrite a database that already has rows")
+    args = parser.parse_args()
+
+    data_io.ensure_data_files()
+    store = SQLiteStore(args.db)
+    if not store.is_empty() and not args.force:
+        print(f"{args.db} already contains data; use --force to replace it.")
+        sys.exit(1)
+
+    counts = store.import_csv(data_io.COURSES, data_io.USERS, data_io.ENROLLMENTS)
+    for name, n in counts.items():
+        print(f"Imported {n} {name}")
+    print(f"Done. Start the app with ELEARN_STORAGE=sqlite to use {args.db}")
+
+
+if __name__ == "__main__":
+    main()
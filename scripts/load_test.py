@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# scripts/load_test.py
+"""
+Load test: simulated student sessions hammering utils/data_io and
+utils/auth from several threads and processes at once.
+
+Each worker thread runs --ops operations drawn from a weighted mix:
+  login       auth.login_user(username, password)
+  browse      data_io.query_courses (load_courses + search 30% of the time,
+              random sort and page of 12)
+  enroll      data_io.enroll_user(user, course)
+  my_courses  data_io.my_courses_for_user(user)
+  add_course  data_io.add_course (occasional)
+
+For every dataset size (N courses, N users, N Zipf-distributed
+enrollments from scripts/generate_dataset.py, built fresh in a temporary
+directory) it reports throughput, per-operation latency
+percentiles and an integrity check of the tables afterwards:
+  lost_enrollments       acknowledged enrollments missing from the table
+  duplicate_enrollments  extra rows for a (user, course) pair
+  duplicate_ids          enrollment / course ids used twice
+  double_acks            the same new pair acknowledged to two callers
+  unexpected_rows        rows neither in the dataset nor acknowledged
+  lost_courses           add_course ids missing from the table
+
+Output is JSON (stdout, and --out FILE); the exit status is 1 if any
+integrity check failed.
+
+Usage:
+  python scripts/load_test.py
+  python scripts/load_test.py --sizes 1000 --threads 16 --processes 4
+  python scripts/load_test.py --backend sqlite --out load_test.json
+  python scripts/load_test.py --backend arrow
+  python scripts/load_test.py --mix login=5,browse=60,enroll=20,my_courses=15,add_course=0
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DEFAULT_MIX = "login=10,browse=50,enroll=15,my_courses=20,add_course=5"
+PASSWORD = "load-test"
+SEARCH_TERMS = ["python", "data", "introduction", "web", "design", "lab", "advanced statistics"]
+HOT_SHARE = 0.3      # share of enroll ops aimed at the hot users x courses below
+HOT_USERS = 10
+HOT_COURSES = 5
+
+# -------------------------
+# Dataset
+# -------------------------
+
+
+def build_dataset(n, seed):
+    """N courses, N users and N enrollments under ./data (scripts/generate_dataset.py)."""
+    from generate_dataset import generate
+
+    # one cheap hash shared by everyone: the test measures the data layer, not bcrypt
+    generate("data", n, n, n, seed=seed, password=PASSWORD, bcrypt_rounds=4, admins=0)
+
+
+def use_backend(backend):
+    from utils import data_io
+
+    if backend == "sqlite":
+        data_io.set_storage_backend("sqlite", Path("data") / "load_test.db")
+    elif backend == "arrow":
+        data_io.set_storage_backend("arrow")
+    return data_io
+
+
+def import_sqlite():
+    from utils.sqlite_store import SQLiteStore
+
+    data_io = use_backend("sqlite")
+    SQLiteStore(data_io.SQLITE_DB).import_csv(data_io.COURSES, data_io.USERS, data_io.ENROLLMENTS)
+
+
+def import_arrow():
+    from utils import arrow_store
+
+    data_io = use_backend("arrow")
+    for name, path in data_io.ARROW_FILES.items():
+        csv_path = {"courses": data_io.COURSES, "users": data_io.USERS,
+                    "enrollments": data_io.ENROLLMENTS}[name]
+        arrow_store.write_frame(path, name, data_io._read_csv_safe(csv_path))
+
+# -------------------------
+# Workers
+# -------------------------
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"login", "browse", "enroll", "my_courses", "add_course"}
+    if unknown:
+        raise SystemExit(f"unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def run_thread(n, ops, mix, seed, out):
+    from utils import auth, data_io
+
+    rng = random.Random(seed)
+    sort_keys = list(data_io.COURSE_SORT_KEYS)
+    names = list(mix)
+    weights = [mix[k] for k in names]
+    lat = {k: [] for k in names}
+    errors = {k: 0 for k in names}
+    enrolled, courses, rejected = [], [], 0
+
+    for i in range(ops):
+        op = rng.choices(names, weights)[0]
+        uid = rng.randint(1, n)
+        t0 = time.perf_counter()
+        try:
+            if op == "login":
+                if not auth.login_user(f"user{uid}", PASSWORD):
+                    raise RuntimeError("login refused")
+            elif op == "browse":
+                text = rng.choice(SEARCH_TERMS) if rng.random() < 0.3 else None
+                page = rng.randint(0, 20)
+                data_io.query_courses(text, rng.choice(sort_keys), page * 12, 12, as_records=True)
+            elif op == "enroll":
+                if rng.random() < HOT_SHARE:
+                    # popular pairs, so concurrent duplicate clicks actually race
+                    uid = rng.randint(1, min(n, HOT_USERS))
+                    cid = rng.randint(1, min(n, HOT_COURSES))
+                else:
+                    cid = rng.randint(1, n)
+                if data_io.enroll_user(uid, cid):
+                    enrolled.append((uid, cid))
+                else:
+                    rejected += 1
+            elif op == "my_courses":
+                data_io.my_courses_for_user(uid)
+            elif op == "add_course":
+                cid = data_io.add_course(f"Load test course {seed}-{i}", "Added by load_test.py",
+                                         "Load Tester")
+                courses.append(int(cid))
+        except Exception:
+            errors[op] += 1
+        lat[op].append((time.perf_counter() - t0) * 1000)
+
+    out.append({"lat": lat, "errors": errors, "enrolled": enrolled,
+                "courses": courses, "rejected": rejected})
+
+
+def run_process(job):
+    """One process: chdir into the dataset and run its threads."""
+    workdir, backend, n, threads, ops, mix, seed = job
+    os.chdir(workdir)
+    sys.path.insert(0, str(ROOT))
+    use_backend(backend).invalidate_tables()
+    results = []
+    started = time.time()
+    pool = [threading.Thread(target=run_thread, args=(n, ops, mix, seed * 1000 + t, results))
+            for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    finished = time.time()
+    try:
+        from utils import data_io
+        data_io.flush_enrollment_log()
+    except Exception:
+        pass
+    return {"results": results, "started": started, "finished": finished}
+
+# -------------------------
+# Report
+# -------------------------
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 3)
+
+    return {"count": len(ordered), "mean_ms": round(sum(ordered) / len(ordered), 3),
+            "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+            "max_ms": round(ordered[-1], 3)}
+
+
+def check_integrity(n, backend, results):
+    import pandas as pd
+
+    data_io = use_backend(backend)
+    data_io.invalidate_tables()
+    enrollments = data_io.load_enrollments()
+    courses = data_io.load_courses()
+
+    acked = [pair for r in results for pair in r["enrolled"]]
+    added = [cid for r in results for cid in r["courses"]]
+    pairs = pd.Series(list(zip(enrollments["user_id"].astype(int),
+                               enrollments["course_id"].astype(int))))
+    present = set(pairs)
+    counts = pairs.value_counts()
+
+    report = {
+        "acknowledged_enrollments": len(acked),
+        "rejected_duplicates": sum(r["rejected"] for r in results),
+        "lost_enrollments": sum(1 for pair in set(acked) if pair not in present),
+        "duplicate_enrollments": int((counts - 1).sum()),
+        "duplicate_ids": int(enrollments["id"].duplicated().sum()),
+        "double_acks": len(acked) - len(set(acked)),
+        "unexpected_rows": len(enrollments) - n - len(set(acked)),
+        "courses_added": len(added),
+        "lost_courses": len(set(added) - set(courses["id"].astype(int))),
+        "duplicate_course_ids": int(courses["id"].duplicated().sum()),
+    }
+    report["ok"] = not any(report[k] for k in (
+        "lost_enrollments", "duplicate_enrollments", "duplicate_ids", "double_acks",
+        "unexpected_rows", "lost_courses", "duplicate_course_ids"))
+    return report
+
+
+def run_size(n, args, mix):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            build_dataset(n, args.seed)
+            if args.backend == "sqlite":
+                import_sqlite()
+            elif args.backend == "arrow":
+                import_arrow()
+            jobs = [(tmp, args.backend, n, args.threads, args.ops, mix, args.seed + p)
+                    for p in range(args.processes)]
+            if args.processes == 1:
+                per_process = [run_process(jobs[0])]
+            else:
+                ctx = multiprocessing.get_context("spawn")
+                with ctx.Pool(args.processes) as pool:
+                    per_process = pool.map(run_process, jobs)
+            # from the first worker starting to the last finishing (no process spawn time)
+            wall = (max(p["finished"] for p in per_process)
+                    - min(p["started"] for p in per_process))
+            results = [r for p in per_process for r in p["results"]]
+            integrity = check_integrity(n, args.backend, results)
+        finally:
+            os.chdir(cwd)
+
+    ops = {}
+    all_lat = []
+    for name in mix:
+        lat = [v for r in results for v in r["lat"].get(name, ())]
+        all_lat.extend(lat)
+        ops[name] = dict(percentiles(lat), errors=sum(r["errors"].get(name, 0) for r in results))
+    return {
+        "size": n,
+        "backend": args.backend,
+        "processes": args.processes,
+        "threads_per_process": args.threads,
+        "operations": len(all_lat),
+        "wall_s": round(wall, 3),
+        "throughput_ops_s": round(len(all_lat) / wall, 1) if wall else None,
+        "latency": percentiles(all_lat),
+        "ops": ops,
+        "integrity": integrity,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated dataset sizes (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=8, help="threads per process")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--ops", type=int, default=200, help="operations per thread")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="op=weight list (default: %(default)s)")
+    parser.add_argument("--backend", choices=["csv", "sqlite", "arrow"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    runs = [run_size(int(x), args, mix) for x in args.sizes.split(",") if x.strip()]
+    report = json.dumps({"generated_at": time.time(), "mix": mix, "runs": runs}, indent=2)
+    print(report)
+    if args.out:
+        Path(args.out).write_text(report + "\n", encoding="utf-8")
+    sys.exit(0 if all(r["integrity"]["ok"] for r in runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
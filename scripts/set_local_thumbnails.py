@@ -7,9 +7,12 @@
 import sys
 from pathlib import Path
 import shutil
-import pandas as pd
 import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import data_io  # noqa: E402
+
 ROOT = Path('.')
 DATA_DIR = ROOT / 'data'
 COURSES_FILE = DATA_DIR / 'courses.csv'
@@ -47,43 +50,20 @@ def backup_courses():
     return backup_file
 
 
-def load_courses():
-    try:
-        df = pd.read_csv(COURSES_FILE, dtype=str).fillna("")
-        required_cols = ["id", "title", "description",
-                         "instructor", "thumbnail", "asset_path"]
-        for col in required_cols:
-            if col not in df.columns:
-                df[col] = ""
-        return df
-    except Exception as e:
-        print("❌ Error reading courses.csv ->", e)
-        sys.exit(1)
-
-
-def apply_mapping(df):
-    updated = 0
-    for i, row in df.iterrows():
-        title = str(row["title"]).strip()
-        if title in THUMB_MAPPING:
-            path = THUMB_MAPPING[title]
-
-            # Warning if image not found
-            if not Path(path).exists():
-                print(f"⚠ Warning: file missing for '{title}': {path}")
-
-            df.at[i, "thumbnail"] = path
-            updated += 1
-
-    return df, updated
+def apply_mapping():
+    """Point every mapped title at its thumbnail in one atomic write; return rows changed."""
+    courses = data_io.load_columns("courses", ("title",))
+    titles = set(courses["title"].astype(str).str.strip()) if "title" in courses else set()
 
+    # Warning if image not found (once per mapped title)
+    for title, path in THUMB_MAPPING.items():
+        if title in titles and not Path(path).exists():
+            print(f"⚠ Warning: file missing for '{title}': {path}")
 
-def write_courses(df):
     try:
-        df.to_csv(COURSES_FILE, index=False, encoding="utf-8")
-        print(f"💾 Updated {COURSES_FILE}")
+        return data_io.update_courses_by_title("thumbnail", THUMB_MAPPING)
     except Exception as e:
-        print("❌ Error writing courses.csv:", e)
+        print("❌ Error updating courses.csv:", e)
         sys.exit(1)
 
 
@@ -91,9 +71,8 @@ def main():
     print("\n=== Setting Local Thumbnails ===")
     ensure_paths()
     backup_courses()
-    df = load_courses()
-    df, count = apply_mapping(df)
-    write_courses(df)
+    count = apply_mapping()
+    print(f"💾 Updated {COURSES_FILE}")
     print(f"✔ Done — updated {count} course thumbnails\n")
 
 
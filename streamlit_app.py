@@ -1,6 +1,5 @@
 # streamlit_app.py
 import streamlit as st
-import importlib
 import traceback
 from pathlib import Path
 
@@ -11,7 +10,8 @@ try:
 except Exception:
     auth_using_module = False
 
-from utils.data_io import ensure_data_files, load_users, save_users
+from utils.data_io import load_users, save_users, find_user
+from utils import metrics, page_registry, warmup
 
 # -------------------------
 # CSV-backed fallback auth
@@ -41,15 +41,11 @@ def _fallback_register_user(username, password, role="student"):
 
 
 def _fallback_login_user(username, password):
-    users = load_users()
-    if users.empty:
-        return None
-    # exact match (plain-text password). Adapt if you have hashed passwords.
-    matched = users[(users['username'] == username) &
-                    (users['password'] == password)]
-    if matched.empty:
+    # O(1) lookup through the data_io username index
+    row = find_user(username)
+    # exact match (plain-text password); hashed passwords need utils.auth (bcrypt)
+    if row is None or str(row.get('password')) != str(password):
         return None
-    row = matched.iloc[0].to_dict()
     # return a consistent dict: id, username, role
     return {'id': int(row.get('id')), 'username': row.get('username'), 'role': row.get('role')}
 
@@ -60,11 +56,10 @@ def _fallback_get_user_role(user):
     if isinstance(user, dict):
         return user.get('role')
     # if username string, lookup
-    users = load_users()
-    found = users[users['username'] == str(user)]
-    if found.empty:
+    found = find_user(str(user))
+    if found is None:
         return None
-    return found.iloc[0].get('role')
+    return found.get('role')
 
 
 # choose functions (use real auth if available, else fallback)
@@ -73,11 +68,6 @@ if not auth_using_module:
     register_user = _fallback_register_user
     get_user_role = _fallback_get_user_role
 
-# -------------------------
-# Ensure data files exist
-# -------------------------
-ensure_data_files()
-
 # -------------------------
 # Page navigation helpers
 # -------------------------
@@ -88,14 +78,19 @@ PAGES = [
     ("p4_admin", "p4 admin"),
 ]
 
+# -------------------------
+# Warm start (once per process): data files, tables, indexes, pages
+# -------------------------
+warmup.run([mod for (mod, _) in PAGES])
+
 
 def run_page(page_module_name, user):
     """
-    Dynamically import pages.<page_module_name> and call its app(user) function.
+    Fetch pages.<page_module_name> from the page registry (imported once per
+    process) and call its app(user) function.
     """
     try:
-        module = importlib.import_module(f"pages.{page_module_name}")
-        importlib.reload(module)
+        module = page_registry.get_page(page_module_name)
     except Exception as e:
         st.error(f"Failed to import page {page_module_name}: {e}")
         tb = traceback.format_exc()
@@ -106,10 +101,11 @@ def run_page(page_module_name, user):
     try:
         if hasattr(module, "app"):
             # some pages accept user arg, some may not — try both
-            try:
-                module.app(user)
-            except TypeError:
-                module.app()
+            with metrics.span(f"page.{page_module_name}"):
+                try:
+                    module.app(user)
+                except TypeError:
+                    module.app()
         else:
             st.error(f"Page module {page_module_name} has no `app` function.")
     except Exception as e:
@@ -178,6 +174,7 @@ def auth_sidebar():
 
 
 def main():
+    metrics.begin_rerun()
     st.set_page_config(page_title="E-Learning (Streamlit)", layout="wide")
     st.title("streamlit app")
 
@@ -197,12 +194,20 @@ def main():
 
     st.sidebar.markdown("---")
     st.sidebar.caption("Mini e-learning - Streamlit")
+    if page_registry.DEV_RELOAD:
+        with st.sidebar.expander("Page reloads (dev)"):
+            st.json(page_registry.stats())
 
     # get current user object
     user = st.session_state.user
 
     # Run chosen page
-    run_page(selected_module, user)
+    try:
+        run_page(selected_module, user)
+    finally:
+        # shown by the admin page on the next rerun
+        st.session_state["last_rerun_timings"] = metrics.end_rerun()
+        warmup.start_background()
 
 
 if __name__ == "__main__":
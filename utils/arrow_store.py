@@ -0,0 +1,88 @@
+# utils/arrow_store.py
+"""Arrow IPC storage backend for courses, users and enrollments.
+
+Enabled with ELEARN_STORAGE=arrow (see utils/data_io.py). Each table is
+one uncompressed Arrow IPC file (data/<table>.arrow) with a fixed schema:
+every id column is int64, everything else a string. Nothing is parsed or
+type-inferred on load:
+
+- read_frame() memory-maps the file; int64 columns reach pandas without
+  a copy and only the requested columns are materialized
+- write_frame() casts to the schema and replaces the file atomically
+
+Convert existing CSVs with scripts/convert_to_arrow.py.
+"""
+import pandas as pd
+import pyarrow as pa
+
+from utils.write_coordinator import atomic_write_binary
+
+SCHEMAS = {
+    'courses': pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('instructor', pa.string()),
+        ('thumbnail', pa.string()),
+        ('asset_path', pa.string()),
+    ]),
+    'users': pa.schema([
+        ('id', pa.int64()),
+        ('username', pa.string()),
+        ('password', pa.string()),
+        ('role', pa.string()),
+    ]),
+    'enrollments': pa.schema([
+        ('id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('course_id', pa.int64()),
+    ]),
+}
+
+
+def _column(values, type_):
+    if pa.types.is_integer(type_):
+        # raises on blanks / non-numeric ids instead of silently coercing
+        return pa.array(pd.to_numeric(values, errors='raise').astype('int64'), type=type_)
+    return pa.array(values.astype('string'), type=type_, from_pandas=True)
+
+
+def to_arrow(name, df):
+    """Cast a table's DataFrame to its schema (extra columns are kept as strings)."""
+    schema = SCHEMAS[name]
+    fields = list(schema)
+    fields += [pa.field(str(c), pa.string()) for c in df.columns if c not in schema.names]
+    arrays = []
+    for field in fields:
+        if field.name in df.columns:
+            arrays.append(_column(df[field.name], field.type))
+        else:
+            arrays.append(pa.nulls(len(df), field.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_frame(path, name, df):
+    table = to_arrow(name, df)
+
+    def write(f):
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+    atomic_write_binary(path, write)
+
+
+def write_empty(path, name):
+    write_frame(path, name, pd.DataFrame(columns=SCHEMAS[name].names))
+
+
+def read_frame(path, columns=None):
+    """
+    Load an Arrow IPC file as a DataFrame through a memory map. columns
+    limits the result to those columns (missing ones are skipped).
+    """
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    # split_blocks keeps each null-free int64 column as a view of the mapped buffer
+    return table.to_pandas(split_blocks=True)
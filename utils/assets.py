@@ -0,0 +1,139 @@
+# utils/assets.py
+"""
+Serving local course assets (PDFs) without inlining them into the page.
+
+- static_url(path): publish a local file under static/ (hard link, or copy
+  as a fallback) and return the URL Streamlit's static file server exposes
+  for it (needs server.enableStaticServing, see .streamlit/config.toml).
+  The browser fetches the file itself, so nothing goes over the websocket.
+- read_asset(path): bytes from a size-bounded LRU keyed by path + mtime +
+  size, used only when the user actually asks for a st.download_button.
+"""
+import os
+import shutil
+import hashlib
+import threading
+import urllib.parse
+from pathlib import Path
+from collections import OrderedDict
+
+from utils import metrics
+
+STATIC_DIR = Path("static")
+STATIC_ASSET_DIR = STATIC_DIR / "assets"
+STATIC_URL_PREFIX = "app/static/assets"
+
+# Total bytes of asset data kept in memory across all sessions.
+ASSET_CACHE_BYTES = int(os.getenv("ELEARN_ASSET_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_bytes_cache = OrderedDict()   # (path, mtime_ns, size) -> bytes
+_bytes_total = 0
+_published = {}                # (path, mtime_ns, size) -> url
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _key(path):
+    """Return (path, mtime_ns, size) for a local file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def is_local_asset(path):
+    return bool(path) and isinstance(path, str) and _key(path) is not None
+
+
+def asset_size(path):
+    key = _key(path)
+    return key[2] if key else None
+
+
+def download_name(asset):
+    """
+    File name to save an asset (local path or URL) under: the name it was
+    uploaded as if it is a content-addressed upload ("<sha256>.pdf", see
+    utils/upload_queue.py), else its own base name.
+    """
+    path = urllib.parse.urlsplit(str(asset)).path if "://" in str(asset) else str(asset)
+    base = os.path.basename(urllib.parse.unquote(path))
+    digest = Path(base).stem
+    if len(digest) == 64 and all(c in "0123456789abcdef" for c in digest):
+        from utils.data_io import find_blob
+        entry = find_blob(digest) or {}
+        if entry.get("name"):
+            return entry["name"]
+    return base
+
+# -------------------------
+# Byte cache
+# -------------------------
+
+
+def read_asset(path):
+    """Return the file's bytes, served from the LRU when unchanged on disk."""
+    global _bytes_total
+    key = _key(path)
+    if key is None:
+        raise FileNotFoundError(path)
+    with _lock:
+        data = _bytes_cache.get(key)
+        if data is not None:
+            _bytes_cache.move_to_end(key)
+            _stats["hits"] += 1
+            return data
+        _stats["misses"] += 1
+    with metrics.span("assets.read_file"), open(path, "rb") as f:
+        data = f.read()
+    if len(data) > ASSET_CACHE_BYTES:
+        return data  # too big to cache; caller streams it once
+    with _lock:
+        if key not in _bytes_cache:
+            _bytes_cache[key] = data
+            _bytes_total += len(data)
+        while _bytes_total > ASSET_CACHE_BYTES and _bytes_cache:
+            _, old = _bytes_cache.popitem(last=False)
+            _bytes_total -= len(old)
+            _stats["evictions"] += 1
+    return data
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_bytes_cache), bytes=_bytes_total)
+
+# -------------------------
+# Static publishing
+# -------------------------
+
+
+def static_url(path):
+    """
+    Return a static-server URL for a local file, publishing it on first use.
+    The name embeds a digest of path + mtime + size, so an edited file gets
+    a new URL and browsers can cache the old one forever.
+    """
+    key = _key(path)
+    if key is None:
+        return None
+    url = _published.get(key)
+    if url is not None:
+        return url
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+    name = f"{digest}-{Path(path).name}"
+    target = STATIC_ASSET_DIR / name
+    if not target.exists():
+        STATIC_ASSET_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+    # file names may hold spaces, '#', '?' etc.; the URL needs them encoded
+    url = f"{STATIC_URL_PREFIX}/{urllib.parse.quote(name)}"
+    with _lock:
+        _published[key] = url
+    return url
@@ -1,8 +1,24 @@
+import os
+import hmac
+import hashlib
+import threading
+from collections import OrderedDict
+
+import bcrypt
 import pandas as pd
-from pathlib import Path
 
-# File path for users CSV
-USERS_FILE = Path("data/users.csv")
+from utils import data_io, metrics
+
+# File path for users CSV (used by the default CSV storage backend)
+USERS_FILE = data_io.USERS
+
+# bcrypt work factor for new hashes (each +1 doubles hashing time)
+BCRYPT_ROUNDS = int(os.getenv("ELEARN_BCRYPT_ROUNDS", "12"))
+# How many recent successful verifications to remember (0 disables)
+VERIFY_CACHE_SIZE = int(os.getenv("ELEARN_VERIFY_CACHE_SIZE", "2048"))
+
+_verify_lock = threading.Lock()
+_verified = OrderedDict()  # sha256(stored hash + password) -> True
 
 # ------------------------------------------------------------------
 # Ensure file exists (header only if missing)
@@ -10,9 +26,7 @@ USERS_FILE = Path("data/users.csv")
 
 
 def ensure_user_file():
-    USERS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    if not USERS_FILE.exists():
-        USERS_FILE.write_text("id,username,password,role\n", encoding="utf-8")
+    data_io.ensure_data_files()
 
 # ------------------------------------------------------------------
 # Read all users
@@ -20,9 +34,8 @@ def ensure_user_file():
 
 
 def load_users():
-    ensure_user_file()
     try:
-        df = pd.read_csv(USERS_FILE)
+        df = data_io.load_users()
         if df.empty:
             return []
         return df.to_dict(orient="records")
@@ -35,42 +48,84 @@ def load_users():
 
 
 def save_users(users):
-    pd.DataFrame(users).to_csv(USERS_FILE, index=False)
+    data_io.save_users(pd.DataFrame(users))
 
 # ------------------------------------------------------------------
-# Register a new user
+# Password hashing
 # ------------------------------------------------------------------
 
 
-def register_user(username, password, role="student"):
-    ensure_user_file()
-    users = load_users()
+@metrics.timed("auth.hash_password")
+def hash_password(password, rounds=None):
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("ascii")
+
+
+def _is_bcrypt_hash(stored):
+    return isinstance(stored, str) and stored.startswith(("$2a$", "$2b$", "$2y$"))
+
 
-    # Prevent duplicates
-    if any(u["username"] == username for u in users):
+def verify_password(password, stored):
+    """
+    Check password against a stored bcrypt hash (or a legacy plain-text value).
+    Recent successes are kept in a bounded LRU so repeated logins skip bcrypt.
+    """
+    if not isinstance(stored, str) or password is None:
         return False
+    if not _is_bcrypt_hash(stored):
+        return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+
+    # key on the stored hash too, so a password change invalidates the entry
+    key = hashlib.sha256(f"{stored}\0{password}".encode("utf-8")).digest()
+    with _verify_lock:
+        if key in _verified:
+            _verified.move_to_end(key)
+            return True
+    try:
+        with metrics.span("auth.bcrypt_verify"):
+            ok = bcrypt.checkpw(password.encode("utf-8"), stored.encode("ascii"))
+    except ValueError:
+        return False
+    if ok and VERIFY_CACHE_SIZE > 0:
+        with _verify_lock:
+            _verified[key] = True
+            while len(_verified) > VERIFY_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return ok
 
-    new_id = len(users) + 1
-    users.append({
-        "id": new_id,
-        "username": username,
-        "password": password,
-        "role": role
-    })
-    save_users(users)
-    return True
+# ------------------------------------------------------------------
+# Register a new user
+# ------------------------------------------------------------------
+
+
+@metrics.timed("auth.register")
+def register_user(username, password, role="student"):
+    # add_user() refuses duplicates and assigns the next id
+    return data_io.add_user(username, hash_password(password), role) is not None
 
 # ------------------------------------------------------------------
 # Authenticate (login)
 # ------------------------------------------------------------------
 
 
+@metrics.timed("auth.login")
 def login_user(username, password):
-    users = load_users()
-    for u in users:
-        if u["username"] == username and u["password"] == password:
-            return u
-    return None
+    u = data_io.find_user(username)
+    if u is None:
+        return None
+    stored = u.get("password")
+    if isinstance(stored, (int, float)) and not pd.isna(stored):
+        stored = str(stored)  # numeric passwords read back from CSV
+    if not verify_password(password, stored):
+        return None
+    if not _is_bcrypt_hash(stored):
+        # upgrade legacy plain-text passwords on first successful login
+        try:
+            data_io.update_user(username, password=hash_password(password))
+        except Exception:
+            pass
+    u.pop("password", None)
+    return u
 
 # ------------------------------------------------------------------
 # Get user role
@@ -78,8 +133,7 @@ def login_user(username, password):
 
 
 def get_user_role(username):
-    users = load_users()
-    for u in users:
-        if u["username"] == username:
-            return u["role"]
+    u = data_io.find_user(username)
+    if u is not None:
+        return u["role"]
     return None
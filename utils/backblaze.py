@@ -1,10 +1,19 @@
 # utils/backblaze.py
+import io
 import os
-import boto3
+import time
+import hashlib
+import mimetypes
+import threading
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
-from botocore.client import Config
 from pathlib import Path
 
+from utils import metrics
+
 load_dotenv()
 
 B2_KEY_ID = os.getenv("B2_KEY_ID")
@@ -13,34 +22,154 @@ B2_BUCKET = os.getenv("B2_BUCKET")
 # example: https://s3.us-east-005.backblazeb2.com
 B2_ENDPOINT = os.getenv("B2_ENDPOINT")
 
-# If upload fails, optionally save locally to 'assets/uploads'
+# Multipart settings for large PDFs (bytes / threads per upload)
+MULTIPART_THRESHOLD = int(os.getenv("B2_MULTIPART_THRESHOLD", str(16 * 1024 * 1024)))
+MULTIPART_CHUNKSIZE = int(os.getenv("B2_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+MAX_CONCURRENCY = int(os.getenv("B2_MAX_CONCURRENCY", "8"))
+
+# If upload fails, optionally save locally to 'assets/uploads' (created on first use)
 FALLBACK_LOCAL = True
 LOCAL_UPLOAD_DIR = Path("assets/uploads")
-LOCAL_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+_client = None
+_client_lock = threading.Lock()
+_transfer_config = None
+_recent = deque(maxlen=50)     # per-upload timing records, newest last
+HASH_CHUNK = 1024 * 1024
 
 
 def _get_client():
+    """Process-wide S3 client (thread-safe, keeps its connection pool alive)."""
+    global _client
+    if _client is not None:
+        return _client
     if not all([B2_KEY_ID, B2_APP_KEY, B2_BUCKET, B2_ENDPOINT]):
         raise RuntimeError(
             "Backblaze env vars missing. Set B2_KEY_ID, B2_APP_KEY, B2_BUCKET, B2_ENDPOINT in .env")
-    # Use stable config for compat
-    return boto3.client(
-        "s3",
-        endpoint_url=B2_ENDPOINT,
-        aws_access_key_id=B2_KEY_ID,
-        aws_secret_access_key=B2_APP_KEY,
-        config=Config(signature_version="s3v4"),
-        region_name="us-east-1"  # region_name doesn't affect B2 but boto3 wants a value
-    )
-
-
-def upload_fileobj(file_obj, filename):
-    """
-    Upload a file-like object (streamlit uploaded file) to Backblaze B2 via S3 API.
-    - file_obj: file-like object with .read() (Streamlit's UploadedFile is acceptable)
-    - filename: e.g. "thumbnails/img.png" or "pdfs/course123.pdf"
-    Returns: public URL string on success, or None on failure (and may fallback to local path).
-    """
+    with _client_lock:
+        if _client is None:
+            # boto3 is imported on the first upload, not at app start
+            import boto3
+            from botocore.client import Config
+
+            # Use stable config for compat; the pool covers two concurrent
+            # multipart uploads (thumbnail + PDF) at full concurrency
+            _client = boto3.client(
+                "s3",
+                endpoint_url=B2_ENDPOINT,
+                aws_access_key_id=B2_KEY_ID,
+                aws_secret_access_key=B2_APP_KEY,
+                config=Config(signature_version="s3v4",
+                              max_pool_connections=max(10, 2 * MAX_CONCURRENCY)),
+                region_name="us-east-1"  # region_name doesn't affect B2 but boto3 wants a value
+            )
+    return _client
+
+
+def _get_transfer_config():
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        _transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_CHUNKSIZE,
+            max_concurrency=MAX_CONCURRENCY,
+            use_threads=MAX_CONCURRENCY > 1,
+        )
+    return _transfer_config
+
+
+def reset_client():
+    """Drop the cached client/config (after changing credentials or settings)."""
+    global _client, _transfer_config
+    with _client_lock:
+        _client = None
+        _transfer_config = None
+
+
+def _size_of(file_obj):
+    size = getattr(file_obj, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        pos = file_obj.tell()
+        file_obj.seek(0, io.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(pos)
+        return size
+    except Exception:
+        return None
+
+
+def _record(filename, size, seconds, ok):
+    info = {"key": filename, "bytes": size, "seconds": round(seconds, 4), "ok": ok,
+            "mb_per_s": round(size / seconds / 1e6, 2) if size and seconds > 0 else None}
+    _recent.append(info)
+    return info
+
+
+def recent_uploads():
+    """Timing/throughput of the last uploads, newest last."""
+    return list(_recent)
+
+# -------------------------
+# Uploads
+# -------------------------
+
+
+def _public_url(key):
+    return f"{B2_ENDPOINT.rstrip('/')}/{B2_BUCKET}/{key}"
+
+
+def content_key(filename, digest):
+    """'pdfs/syllabus.pdf' + digest -> 'pdfs/<sha256>.pdf' (same bytes, same key)."""
+    name = Path(filename)
+    prefix = name.parent.as_posix()
+    key = f"{digest}{name.suffix.lower()}"
+    return key if prefix in ("", ".") else f"{prefix}/{key}"
+
+
+def hash_fileobj(file_obj):
+    """Return (sha256 hex digest, size) of a seekable file, leaving it at offset 0."""
+    h = hashlib.sha256()
+    size = 0
+    try:
+        file_obj.seek(0)
+    except Exception:
+        pass
+    while True:
+        chunk = file_obj.read(HASH_CHUNK)
+        if not chunk:
+            break
+        h.update(chunk)
+        size += len(chunk)
+    file_obj.seek(0)
+    return h.hexdigest(), size
+
+
+def object_exists(key):
+    """True if key is already in the bucket (HEAD request)."""
+    from botocore.exceptions import ClientError
+    try:
+        _get_client().head_object(Bucket=B2_BUCKET, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def _content_disposition(name):
+    """inline (PDFs still open in the browser), saved under the original name."""
+    fallback = "".join(c if 32 <= ord(c) < 127 and c not in '"\\' else "_" for c in name)
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{urllib.parse.quote(name)}"
+
+
+@metrics.timed("b2.put")
+def _put(file_obj, filename, content_type, stats=None, display_name=None):
+    """Upload over the shared client; raises on failure. Returns the public URL."""
+    t0 = time.perf_counter()
+    size = _size_of(file_obj)
     try:
         client = _get_client()
         # Reset file pointer to start (UploadedFile may already be at start)
@@ -49,21 +178,85 @@ def upload_fileobj(file_obj, filename):
         except Exception:
             pass
 
+        extra = {"ACL": "public-read", "ContentType": content_type}
+        if display_name:
+            extra["ContentDisposition"] = _content_disposition(display_name)
         client.upload_fileobj(
             Fileobj=file_obj,
             Bucket=B2_BUCKET,
             Key=filename,
-            ExtraArgs={"ACL": "public-read",
-                       "ContentType": getattr(file_obj, "type", "binary/octet-stream")}
+            ExtraArgs=extra,
+            Config=_get_transfer_config()
         )
+    except Exception:
+        if stats is not None:
+            stats.update(_record(filename, size, time.perf_counter() - t0, False))
+        raise
+    if stats is not None:
+        stats.update(_record(filename, size, time.perf_counter() - t0, True))
+    return _public_url(filename)
+
+
+def _put_blob(file_obj, filename, content_type, stats=None, digest=None, size=None):
+    """
+    Content-addressed upload: hash, then skip the transfer if the blob index
+    or the bucket already has these bytes. Raises on failure; returns the URL.
+    """
+    from utils.data_io import find_blob, record_blob
 
-        return f"{B2_ENDPOINT.rstrip('/')}/{B2_BUCKET}/{filename}"
+    if digest is None:
+        digest, size = hash_fileobj(file_obj)
+    key = content_key(filename, digest)
+    _get_client()  # fail fast when B2 isn't configured
+    entry = find_blob(digest) or {}
+    # the object is named by its digest; keep what the file was called
+    name = entry.get("name") or Path(filename).name
+    known = entry.get("url")
+    if known and known.startswith(_public_url("")):
+        record_blob(digest, size, hit="remote", name=name)
+        if stats is not None:
+            stats.update(key=known[len(_public_url("")):], bytes=size, dedup="index")
+        return known
+    if object_exists(key):
+        url = _public_url(key)
+        record_blob(digest, size, url=url, hit="remote", name=name)
+        if stats is not None:
+            stats.update(key=key, bytes=size, dedup="bucket")
+        return url
+    url = _put(file_obj, key, content_type, stats, display_name=name)
+    record_blob(digest, size, url=url, hit="miss", name=name)
+    return url
+
+
+@metrics.timed("b2.upload_fileobj")
+def upload_fileobj(file_obj, filename, stats=None):
+    """
+    Upload a file-like object (streamlit uploaded file) to Backblaze B2 via S3 API.
+    - file_obj: file-like object with .read() (Streamlit's UploadedFile is acceptable)
+    - filename: e.g. "thumbnails/img.png" or "pdfs/course123.pdf"; the object
+      is stored content-addressed as "<prefix>/<sha256><ext>"
+    - stats: optional dict, filled with bytes/seconds/mb_per_s for this upload
+      (or dedup="index"/"bucket" when the transfer was skipped)
+    Returns: public URL string on success, or None on failure (and may fallback to local path).
+    """
+    digest = size = None
+    try:
+        digest, size = hash_fileobj(file_obj)
+        return _put_blob(file_obj, filename,
+                         getattr(file_obj, "type", "binary/octet-stream"), stats, digest, size)
     except Exception as e:
         # Don't leak secrets in logs; print a compact message
         print("B2 upload failed:", str(e))
         if FALLBACK_LOCAL:
             try:
-                target = LOCAL_UPLOAD_DIR / Path(filename).name
+                name = content_key(Path(filename).name, digest) if digest else Path(filename).name
+                LOCAL_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+                target = LOCAL_UPLOAD_DIR / name
+                if digest and target.exists():
+                    from utils.data_io import record_blob
+                    record_blob(digest, size, local=target.as_posix(), hit="local",
+                                name=Path(filename).name)
+                    return str(target.as_posix())
                 # Reset pointer and write locally
                 try:
                     file_obj.seek(0)
@@ -76,3 +269,36 @@ def upload_fileobj(file_obj, filename):
             except Exception as e2:
                 print("Local fallback save failed:", e2)
         return None
+
+
+@metrics.timed("b2.upload_path")
+def upload_path(path, filename, content_type=None, stats=None):
+    """Upload a local file content-addressed (no local fallback); raises on failure, returns the URL."""
+    if content_type is None:
+        content_type = mimetypes.guess_type(str(filename))[0] or "binary/octet-stream"
+    with open(path, "rb") as f:
+        return _put_blob(f, filename, content_type, stats)
+
+
+def upload_course_assets(thumbnail=None, thumbnail_key=None, pdf=None, pdf_key=None):
+    """
+    Upload a course's thumbnail and PDF concurrently over the shared client.
+    Either may be None. Returns {"thumbnail": url, "pdf": url, "stats": {...}}
+    where each url is what upload_fileobj returned (None if skipped/failed)
+    and stats holds per-upload bytes/seconds/mb_per_s.
+    """
+    jobs = {name: (f, key) for name, f, key in
+            (("thumbnail", thumbnail, thumbnail_key), ("pdf", pdf, pdf_key)) if f is not None}
+    result = {"thumbnail": None, "pdf": None, "stats": {}}
+    if not jobs:
+        return result
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {}
+        for name, (f, key) in jobs.items():
+            result["stats"][name] = {}
+            futures[name] = pool.submit(upload_fileobj, f, key, result["stats"][name])
+        for name, fut in futures.items():
+            result[name] = fut.result()
+    result["stats"]["total_seconds"] = round(time.perf_counter() - t0, 4)
+    return result
@@ -1,14 +1,54 @@
-﻿import pandas as pd
+﻿import os
+import json
+import time
+import types
+import atexit
+import threading
+from collections import Counter, namedtuple
+import numpy as np
+import pandas as pd
 from pathlib import Path
 
+from utils import metrics, write_coordinator
+
+# Frames handed out by load_*() share their column data with the process-wide
+# cache below. Copy-on-write (the default from pandas 3) makes any in-place
+# edit on such a frame copy the affected columns first, so one caller can
+# never change what other callers and sessions read. Without it (pandas <
+# 1.5) _view() falls back to a deep copy.
+try:
+    pd.set_option('mode.copy_on_write', True)
+    _COPY_ON_WRITE = True
+except Exception:
+    _COPY_ON_WRITE = False
+
 DATA_DIR = Path('data')
 COURSES = DATA_DIR / 'courses.csv'
 USERS = DATA_DIR / 'users.csv'
 ENROLLMENTS = DATA_DIR / 'enrollments.csv'
+POPULARITY_SNAPSHOT = DATA_DIR / 'popularity.json'
+BLOB_INDEX = DATA_DIR / 'blobs.json'
+
+# Storage backend: 'csv' (the files above), 'sqlite' (SQLITE_DB, see
+# utils/sqlite_store.py) or 'arrow' (typed Arrow IPC files, see
+# utils/arrow_store.py). Import existing CSVs with
+# scripts/import_csv_to_sqlite.py / scripts/convert_to_arrow.py before
+# switching.
+STORAGE_BACKEND = os.getenv('ELEARN_STORAGE', 'csv').strip().lower()
+SQLITE_DB = DATA_DIR / 'elearn.db'
+ARROW_FILES = {'courses': DATA_DIR / 'courses.arrow', 'users': DATA_DIR / 'users.arrow',
+               'enrollments': DATA_DIR / 'enrollments.arrow'}
+_sqlite_store = None
 
 
 def ensure_data_files():
     DATA_DIR.mkdir(exist_ok=True)
+    if STORAGE_BACKEND == 'arrow':
+        from utils import arrow_store
+        for name, path in ARROW_FILES.items():
+            if not path.exists():
+                arrow_store.write_empty(path, name)
+        return
     if not COURSES.exists():
         COURSES.write_text(
             'id,title,description,instructor,thumbnail,asset_path\n', encoding='utf-8')
@@ -18,9 +58,31 @@ def ensure_data_files():
         ENROLLMENTS.write_text('id,user_id,course_id\n', encoding='utf-8')
 
 
+def _store():
+    """Return the SQLite store when that backend is selected, else None (CSV)."""
+    global _sqlite_store
+    if STORAGE_BACKEND != 'sqlite':
+        return None
+    if _sqlite_store is None:
+        from utils.sqlite_store import SQLiteStore
+        _sqlite_store = SQLiteStore(SQLITE_DB)
+    return _sqlite_store
+
+
+def set_storage_backend(name, sqlite_path=None):
+    """Switch between the 'csv', 'sqlite' and 'arrow' backends at runtime."""
+    global STORAGE_BACKEND, SQLITE_DB, _sqlite_store
+    if name not in ('csv', 'sqlite', 'arrow'):
+        raise ValueError(f"Unknown storage backend: {name}")
+    STORAGE_BACKEND = name
+    if sqlite_path is not None:
+        SQLITE_DB = Path(sqlite_path)
+    _sqlite_store = None
+    invalidate_tables()
+
+
 def _read_csv_safe(path, columns=None):
     """Read CSV but return an empty dataframe with columns if file empty or invalid."""
-    ensure_data_files()
     try:
         df = pd.read_csv(path)
         return df
@@ -30,131 +92,1152 @@ def _read_csv_safe(path, columns=None):
         return pd.DataFrame(columns=columns)
 
 
+# -------------------------
+# In-memory table store
+# -------------------------
+# Every Streamlit session in this process shares one parsed copy of each
+# table. An entry is reused until the file's (mtime, size) changes on disk
+# or a write goes through this module, so a rerun costs one os.stat()
+# per table instead of a full CSV parse.
+_STORE_LOCK = threading.RLock()
+_TABLES = {}      # table name -> {'sig': (mtime_ns, size), 'df': DataFrame, 'pending': [row dicts]}
+_VERSIONS = {}    # table name -> int, bumped once per change to the table
+_WRITTEN = {}     # table name -> file signature right after our own last write
+_EVENTS = {}      # table name -> change events collected by the running commit
+_LISTENERS = {}   # table name -> [callback(old_version, new_version, events)]
+_PROJECTIONS = {}  # (table name, columns) -> (file sig, DataFrame), arrow backend only
+
+
+def _table_path(name):
+    if STORAGE_BACKEND == 'arrow':
+        return ARROW_FILES[name]
+    return {'courses': COURSES, 'users': USERS, 'enrollments': ENROLLMENTS}[name]
+
+
+def _read_table_file(name, path, columns=None):
+    """Parse a table file; columns (arrow only) limits what is materialized."""
+    if STORAGE_BACKEND == 'arrow':
+        from utils import arrow_store
+        with metrics.span('data_io.read_arrow.' + name):
+            return arrow_store.read_frame(path, columns)
+    with metrics.span('data_io.read_csv.' + name):
+        return _read_csv_safe(path)
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _view(df):
+    """Per-caller frame over the cached table.
+
+    Callers may modify it freely; with copy-on-write the cached column
+    data is only shared until the first write.
+    """
+    return df.copy(deep=not _COPY_ON_WRITE)
+
+
+def on_table_change(name, callback):
+    """Register callback(old_version, new_version, events) for a table.
+
+    events is a list of (kind, payload) tuples describing the change:
+    ('insert', row dict), ('update', row dict), ('delete', id) or
+    ('reset', None) when the table was replaced or changed outside this
+    module. Callbacks run under the store lock and must be quick; a derived
+    index that can't apply the events should just mark itself stale.
+    """
+    with _STORE_LOCK:
+        _LISTENERS.setdefault(name, []).append(callback)
+
+
+def _emit(name, kind, payload=None):
+    """Record a change event from inside a commit mutation."""
+    _EVENTS.setdefault(name, []).append((kind, payload))
+
+
+def _bump(name, events):
+    with _STORE_LOCK:
+        old = _VERSIONS.get(name, 0)
+        _VERSIONS[name] = old + 1
+        for callback in _LISTENERS.get(name, ()):
+            try:
+                callback(old, old + 1, events)
+            except Exception:
+                pass
+
+
+def _forget(name, events=None):
+    """Drop the cached copy of a table after writing it.
+
+    The next read parses the file once, so cached frames always carry the
+    same dtypes a fresh pd.read_csv would produce. That re-read does not
+    count as a new version.
+    """
+    with _STORE_LOCK:
+        _TABLES.pop(name, None)
+        _WRITTEN[name] = 'self' if _store() is not None else _file_sig(_table_path(name))
+        if events is None:
+            events = _EVENTS.pop(name, None) or [('reset', None)]
+        _bump(name, events)
+
+
+def _load_table(name):
+    """Return the cached DataFrame for a table, re-reading it if stale."""
+    store = _store()
+    if store is not None:
+        with metrics.span('data_io.load.' + name):
+            df = store.load_table(name)
+        with _STORE_LOCK:
+            entry = _TABLES.get(name)
+            if entry is None or entry['df'] is not df:
+                _TABLES[name] = {'sig': None, 'df': df, 'pending': []}
+                if _WRITTEN.pop(name, None) != 'self':
+                    _bump(name, [('reset', None)])
+        return df
+    path = _table_path(name)
+    sig = _file_sig(path)
+    if sig is None:
+        ensure_data_files()
+        sig = _file_sig(path)
+    with _STORE_LOCK:
+        entry = _TABLES.get(name)
+        if entry is not None and entry['sig'] == sig:
+            if entry['pending']:
+                # rows appended through this module since the last read
+                entry['df'] = pd.concat(
+                    [entry['df'], pd.DataFrame(entry['pending'])], ignore_index=True)
+                entry['pending'] = []
+            return entry['df']
+        df = _read_table_file(name, path)
+        _TABLES[name] = {'sig': sig, 'df': df, 'pending': []}
+        if _WRITTEN.pop(name, None) != sig:
+            _bump(name, [('reset', None)])
+        return df
+
+
+def _write_table(name, df):
+    store = _store()
+    with metrics.span('data_io.write.' + name):
+        if store is not None:
+            store.replace_table(name, df)
+        elif STORAGE_BACKEND == 'arrow':
+            from utils import arrow_store
+            arrow_store.write_frame(_table_path(name), name, df)
+        else:
+            write_coordinator.atomic_write_csv(_table_path(name), df)
+    _forget(name)
+
+
+def _commit(name, mutation):
+    """Run mutation(df) -> (new_df, result) on a table and persist it.
+
+    Goes through utils/write_coordinator: one writer per table (thread and
+    OS file lock), the table is re-read fresh under the lock, concurrent
+    callers are flushed together in one atomic rewrite, and each caller
+    gets back its own result.
+    """
+    def read():
+        ensure_data_files()
+        _EVENTS.pop(name, None)
+        return _load_table(name)
+
+    with metrics.span('data_io.commit.' + name):
+        return write_coordinator.commit(
+            name, _table_path(name), read=read,
+            write=lambda df: _write_table(name, df), mutation=mutation)
+
+
+def table_version(name):
+    """Return a counter that changes whenever the given table changes."""
+    _load_table(name)
+    return _VERSIONS.get(name, 0)
+
+
+def invalidate_tables():
+    """Drop every cached table so the next read re-parses from disk."""
+    with _STORE_LOCK:
+        _TABLES.clear()
+        _PROJECTIONS.clear()
+
+
+def load_columns(name, columns):
+    """Return only the given columns of a table.
+
+    Sliced from the cached table when that is loaded and current. With the
+    arrow backend an uncached table is instead read column-projected from
+    the memory-mapped file, so e.g. search never materializes thumbnails.
+    """
+    columns = tuple(columns)
+    if STORAGE_BACKEND != 'arrow':
+        df = _load_table(name)
+        return df[[c for c in columns if c in df.columns]]
+    path = _table_path(name)
+    sig = _file_sig(path)
+    if sig is None:
+        ensure_data_files()
+        sig = _file_sig(path)
+    with _STORE_LOCK:
+        entry = _TABLES.get(name)
+        if entry is not None and entry['sig'] == sig:
+            df = entry['df']
+            return df[[c for c in columns if c in df.columns]]
+        hit = _PROJECTIONS.get((name, columns))
+        if hit is not None and hit[0] == sig:
+            return _view(hit[1])
+    df = _read_table_file(name, path, columns)
+    with _STORE_LOCK:
+        _PROJECTIONS[(name, columns)] = (sig, df)
+    return _view(df)
+
+
 # -------------------------
 # Courses
 # -------------------------
 def load_courses():
     """Return courses DataFrame."""
-    return _read_csv_safe(COURSES)
+    return _view(_load_table('courses'))
 
 
 def add_course(title, description, instructor, thumbnail='', asset_path=''):
     """Append a new course and return its id."""
-    df = load_courses()
-    if df.empty:
-        next_id = 1
-        df = pd.DataFrame(
-            columns=['id', 'title', 'description', 'instructor', 'thumbnail', 'asset_path'])
-    else:
-        try:
-            max_id = int(df['id'].astype(int).max())
-        except Exception:
-            max_id = len(df)
-        next_id = max_id + 1
-
-    new = {
-        'id': int(next_id),
-        'title': title,
-        'description': description,
-        'instructor': instructor,
-        'thumbnail': thumbnail or '',
-        'asset_path': asset_path or ''
-    }
-    df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
-    df.to_csv(COURSES, index=False)
-    return int(next_id)
+    store = _store()
+    if store is not None:
+        cid = store.add_course(title, description, instructor, thumbnail, asset_path)
+        _forget('courses', [('insert', {
+            'id': cid, 'title': title, 'description': description, 'instructor': instructor,
+            'thumbnail': thumbnail or '', 'asset_path': asset_path or ''})])
+        return cid
+
+    def mutation(df):
+        # next id is taken under the table lock, so concurrent adds never collide
+        if df.empty:
+            next_id = 1
+            df = pd.DataFrame(
+                columns=['id', 'title', 'description', 'instructor', 'thumbnail', 'asset_path'])
+        else:
+            try:
+                max_id = int(df['id'].astype(int).max())
+            except Exception:
+                max_id = len(df)
+            next_id = max_id + 1
+
+        new = {
+            'id': int(next_id),
+            'title': title,
+            'description': description,
+            'instructor': instructor,
+            'thumbnail': thumbnail or '',
+            'asset_path': asset_path or ''
+        }
+        _emit('courses', 'insert', new)
+        return pd.concat([df, pd.DataFrame([new])], ignore_index=True), int(next_id)
+
+    return _commit('courses', mutation)
+
+
+def merge_courses_by_title(updates):
+    """Bulk-set columns from {title: {column: value}} in one vectorized write.
+
+    Titles are compared after stripping whitespace; a value of None leaves
+    that cell alone. Returns the number of rows changed.
+    """
+    updates = {str(k).strip(): v for k, v in updates.items()}
+    columns = sorted({c for values in updates.values() for c in values})
+
+    def mutation(df):
+        if df.empty or not updates:
+            return df, 0
+        titles = df['title'].astype(str).str.strip()
+        new_cols = {}
+        changed = pd.Series(False, index=df.index)
+        for col in columns:
+            new_values = titles.map({t: v.get(col) for t, v in updates.items()})
+            mask = new_values.notna()
+            if col in df.columns:
+                mask &= df[col].astype(object).ne(new_values)
+            if mask.any():
+                new_cols[col] = (new_values, mask)
+                changed |= mask
+        if not changed.any():
+            return df, 0
+        df = df.copy()
+        for col, (new_values, mask) in new_cols.items():
+            if col not in df.columns:
+                df[col] = ''
+            df[col] = df[col].astype(object)
+            df.loc[mask, col] = new_values[mask]
+        for rec in df.loc[changed].to_dict(orient='records'):
+            _emit('courses', 'update', rec)
+        return df, int(changed.sum())
+
+    return _commit('courses', mutation)
+
+
+def update_courses_by_title(column, mapping):
+    """Set column to mapping[title] for every course whose title is a key.
+
+    Runs as one atomic write; returns the number of rows changed.
+    """
+    return merge_courses_by_title({t: {column: v} for t, v in mapping.items()})
+
+
+def update_course(course_id, expected=None, **fields):
+    """Set columns on one course; return True if it was updated.
+
+    expected is an optional {column: value} the row must still hold, so a
+    background job can swap a value without clobbering a newer edit.
+    """
+    expected = expected or {}
+    store = _store()
+    if store is not None:
+        rec = store.update_course(course_id, expected, **fields)
+        if rec is not None:
+            _forget('courses', [('update', rec)])
+        return rec is not None
+
+    def mutation(courses):
+        if courses.empty:
+            return courses, False
+        mask = pd.to_numeric(courses['id'], errors='coerce') == int(course_id)
+        for col, value in expected.items():
+            if col not in courses.columns:
+                return courses, False
+            mask &= courses[col].fillna('').astype(str) == str(value)
+        if not mask.any():
+            return courses, False
+        courses = courses.copy()
+        for col, value in fields.items():
+            if col not in courses.columns:
+                courses[col] = ''
+            courses[col] = courses[col].astype(object)
+            courses.loc[mask, col] = value
+        for rec in courses.loc[mask].to_dict(orient='records'):
+            _emit('courses', 'update', rec)
+        return courses, True
+
+    return _commit('courses', mutation)
 
 
 # -------------------------
 # Users
 # -------------------------
 def load_users():
-    return _read_csv_safe(USERS)
+    return _view(_load_table('users'))
 
 
 def save_users(df):
-    df.to_csv(USERS, index=False)
+    df = df.copy()
+    _commit('users', lambda _current: (df, None))
+
+
+# username -> record dict, rebuilt whenever the users table version changes
+# (every write through this module bumps it), so lookups are O(1).
+_USER_INDEX = {'version': None, 'by_name': {}}
+
+
+def _user_index():
+    version = table_version('users')
+    with _STORE_LOCK:
+        if _USER_INDEX['version'] != version:
+            users = _load_table('users')
+            by_name = {}
+            if not users.empty:
+                for rec in users.to_dict(orient='records'):
+                    by_name.setdefault(str(rec.get('username')), rec)
+            _USER_INDEX['by_name'] = by_name
+            _USER_INDEX['version'] = version
+        return _USER_INDEX['by_name']
+
+
+def find_user(username):
+    """Return the user record for username as a dict, or None."""
+    store = _store()
+    if store is not None:
+        return store.find_user(username)
+    rec = _user_index().get(str(username))
+    return dict(rec) if rec is not None else None
+
+
+def update_user(username, **fields):
+    """Update columns (e.g. password=...) of an existing user; return True if found."""
+    store = _store()
+    if store is not None:
+        found = store.update_user(username, **fields)
+        _forget('users')
+        return found
+
+    def mutation(users):
+        if users.empty:
+            return users, False
+        mask = users['username'].astype(str) == str(username)
+        if not mask.any():
+            return users, False
+        users = users.copy()
+        for col, value in fields.items():
+            if col not in users.columns:
+                users[col] = ''
+            users[col] = users[col].astype(object)
+            users.loc[mask, col] = value
+        return users, True
+
+    return _commit('users', mutation)
+
+
+def add_user(username, password, role='student'):
+    """Create a user and return its id, or None if the username is taken."""
+    store = _store()
+    if store is not None:
+        uid = store.add_user(username, password, role)
+        if uid is not None:
+            _forget('users', [('insert', {'id': uid, 'username': username,
+                                          'password': password, 'role': role})])
+        return uid
+
+    def mutation(users):
+        if users.empty:
+            users = pd.DataFrame(columns=['id', 'username', 'password', 'role'])
+        elif (users['username'] == username).any():
+            return users, None
+        try:
+            next_id = int(pd.to_numeric(users['id'], errors='coerce').max()) + 1
+        except Exception:
+            next_id = len(users) + 1
+        new = {'id': next_id, 'username': username, 'password': password, 'role': role}
+        return pd.concat([users, pd.DataFrame([new])], ignore_index=True), next_id
+
+    return _commit('users', mutation)
 
 
 # -------------------------
 # Enrollments
 # -------------------------
 def load_enrollments():
-    return _read_csv_safe(ENROLLMENTS)
+    return _view(_load_table('enrollments'))
 
 
 def save_enrollments(df):
-    df.to_csv(ENROLLMENTS, index=False)
+    df = df.copy()
+    _commit('enrollments', lambda _current: (df, None))
 
 
-def enroll_user(user_id, course_id):
-    """Enroll a numeric user_id into a numeric course_id."""
-    ensure_data_files()
-    enroll = load_enrollments()
+# Enrollments are an append-only log: enroll_user() appends one CSV line
+# instead of rewriting the file. fsync is batched (every FSYNC_EVERY appends
+# or FSYNC_INTERVAL seconds) and the file is rewritten in canonical form
+# every COMPACT_EVERY appends. An append left unsynced arms a timer that
+# flushes after FSYNC_INTERVAL, so the bound holds even if traffic stops.
+FSYNC_EVERY = 32
+FSYNC_INTERVAL = 1.0
+COMPACT_EVERY = 5000
+
+_LOG_LOCK = threading.Lock()
+_log_state = {'sig': None, 'next_id': None, 'unsynced': 0,
+              'last_sync': 0.0, 'appends': 0, 'timer': None}
+
+
+def _next_enrollment_id():
+    """Return the next enrollment id, recomputing only if the file changed behind our back."""
+    if _log_state['next_id'] is None or _log_state['sig'] != _file_sig(ENROLLMENTS):
+        enroll = _load_table('enrollments')
+        try:
+            ids = pd.to_numeric(enroll['id'], errors='coerce')
+            _log_state['next_id'] = int(ids.max()) + 1 if ids.notna().any() else 1
+        except Exception:
+            _log_state['next_id'] = len(enroll) + 1
+    return _log_state['next_id']
+
+
+def _append_enrollment(row):
+    """Append one row to enrollments.csv and keep the table cache in step."""
+    before = _file_sig(ENROLLMENTS)
+    line = f"{row['id']},{row['user_id']},{row['course_id']}\n"
+    with open(ENROLLMENTS, 'a+b') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            line = 'id,user_id,course_id\n' + line
+        else:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = '\n' + line
+        f.write(line.encode('utf-8'))
+        f.flush()
+        _log_state['unsynced'] += 1
+        now = time.monotonic()
+        if (_log_state['unsynced'] >= FSYNC_EVERY
+                or now - _log_state['last_sync'] >= FSYNC_INTERVAL):
+            os.fsync(f.fileno())
+            _log_state['unsynced'] = 0
+            _log_state['last_sync'] = now
+        elif _log_state['timer'] is None:
+            timer = threading.Timer(FSYNC_INTERVAL, flush_enrollment_log)
+            timer.daemon = True
+            _log_state['timer'] = timer
+            timer.start()
+    after = _file_sig(ENROLLMENTS)
+    _log_state['sig'] = after
+    _log_state['next_id'] = row['id'] + 1
+
+    with _STORE_LOCK:
+        entry = _TABLES.get('enrollments')
+        if entry is not None and entry['sig'] == before and not entry['df'].empty:
+            entry['pending'].append(row)
+            entry['sig'] = after
+        else:
+            _TABLES.pop('enrollments', None)
+            _WRITTEN['enrollments'] = after
+        _bump('enrollments', [('insert', row)])
+
+
+def flush_enrollment_log():
+    """fsync any enrollment appends that are still only in the OS cache."""
+    with _LOG_LOCK:
+        _log_state['timer'] = None
+        if not _log_state['unsynced'] or not ENROLLMENTS.exists():
+            return
+        with open(ENROLLMENTS, 'ab') as f:
+            os.fsync(f.fileno())
+        _log_state['unsynced'] = 0
+        _log_state['last_sync'] = time.monotonic()
+
+
+atexit.register(flush_enrollment_log)
+
+
+def compact_enrollments():
+    """Rewrite enrollments.csv in canonical form.
+
+    Drops blank or torn lines (e.g. a partial append after a crash) and
+    restores integer columns. Query results are unchanged.
+    """
+    if _store() is not None:
+        return 0
+    def mutation(enroll):
+        if enroll.empty:
+            return enroll, 0
+        cols = ['id', 'user_id', 'course_id']
+        clean = enroll[cols].apply(pd.to_numeric, errors='coerce').dropna()
+        return clean.astype('int64'), len(enroll) - len(clean)
+
+    with _LOG_LOCK:
+        dropped = _commit('enrollments', mutation)
+        _log_state['sig'] = None
+        _log_state['unsynced'] = 0
+        _log_state['appends'] = 0
+        return dropped
+
+
+# user_id -> set(course_id), built once per enrollments version and patched
+# in place on enroll, so My Courses and the duplicate check are lookups
+# instead of scans of the whole log.
+_ENROLLED = {'version': None, 'by_user': {}}
+
+
+def _build_enrolled():
+    enroll = load_columns('enrollments', ('user_id', 'course_id'))
+    by_user = {}
+    if enroll.empty:
+        return by_user
+    pairs = enroll[['user_id', 'course_id']].apply(pd.to_numeric, errors='coerce').dropna()
+    for uid, cid in zip(pairs['user_id'].astype('int64').tolist(),
+                        pairs['course_id'].astype('int64').tolist()):
+        by_user.setdefault(uid, set()).add(cid)
+    return by_user
+
+
+def _enrolled_on_change(old, new, events):
+    if _ENROLLED['version'] != old:
+        return
+    by_user = _ENROLLED['by_user']
+    for kind, payload in events:
+        if kind != 'insert' or not isinstance(payload, dict):
+            _ENROLLED['version'] = None
+            return
+        by_user.setdefault(int(payload['user_id']), set()).add(int(payload['course_id']))
+    _ENROLLED['version'] = new
+
+
+on_table_change('enrollments', _enrolled_on_change)
+
+
+def _enrolled_index():
+    version = table_version('enrollments')
+    with _STORE_LOCK:
+        if _ENROLLED['version'] != version:
+            _ENROLLED['by_user'] = _build_enrolled()
+            _ENROLLED['version'] = version
+        return _ENROLLED['by_user']
+
+
+def enrolled_course_ids(user_id):
+    """Return the frozenset of course ids user_id is enrolled in."""
+    with _STORE_LOCK:
+        return frozenset(_enrolled_index().get(int(user_id), ()))
+
+
+def is_enrolled(user_id, course_id):
+    with _STORE_LOCK:
+        return int(course_id) in _enrolled_index().get(int(user_id), ())
+
+
+def _enroll_mutation(enroll, user_id, course_id):
+    uid, cid = int(user_id), int(course_id)
     if enroll.empty:
         next_id = 1
-        enroll = pd.DataFrame(columns=['id', 'user_id', 'course_id'])
     else:
+        # re-checked here: other writers in the same batch aren't in the index yet
+        if ((enroll['user_id'] == uid) & (enroll['course_id'] == cid)).any():
+            return enroll, False
+        next_id = int(enroll['id'].max()) + 1
+    new = {'id': next_id, 'user_id': uid, 'course_id': cid}
+    _emit('enrollments', 'insert', new)
+    return pd.concat([enroll, pd.DataFrame([new])], ignore_index=True), True
+
+
+@metrics.timed('data_io.enroll_user')
+def enroll_user(user_id, course_id):
+    """Enroll a numeric user_id into a numeric course_id.
+
+    Returns False (and writes nothing) if the user is already enrolled.
+    """
+    store = _store()
+    if store is not None:
+        eid = store.enroll_user(user_id, course_id)
+        if eid is None:
+            return False
+        _forget('enrollments', [('insert', {'id': eid, 'user_id': int(user_id),
+                                            'course_id': int(course_id)})])
+        return True
+    if STORAGE_BACKEND == 'arrow':
+        if is_enrolled(user_id, course_id):
+            return False
+        # IPC files have no append-only log: one rewrite through the group commit
+        return _commit('enrollments', lambda enroll: _enroll_mutation(enroll, user_id, course_id))
+    ensure_data_files()
+    # the OS lock makes id allocation + append atomic across processes too
+    with _LOG_LOCK, write_coordinator.table_lock(ENROLLMENTS):
+        if is_enrolled(user_id, course_id):
+            return False
+        new_row = {'id': int(_next_enrollment_id()), 'user_id': int(
+            user_id), 'course_id': int(course_id)}
+        _append_enrollment(new_row)
+        _log_state['appends'] += 1
+        due = _log_state['appends'] >= COMPACT_EVERY
+    if due:
+        compact_enrollments()
+    return True
+
+
+# -------------------------
+# Course search
+# -------------------------
+# Inverted index over title/instructor/description (utils/search_index.py),
+# built once per courses version and patched in place by add/delete.
+_SEARCH = {'version': None, 'index': None}
+SEARCH_COLUMNS = ('id', 'title', 'instructor', 'description')
+
+
+def _search_on_change(old, new, events):
+    index = _SEARCH['index']
+    if index is None or _SEARCH['version'] != old:
+        return
+    for kind, payload in events:
+        if kind in ('insert', 'update'):
+            index.add_course(payload)
+        elif kind == 'delete':
+            index.remove(payload)
+        else:
+            _SEARCH['index'] = None
+            return
+    _SEARCH['version'] = new
+
+
+on_table_change('courses', _search_on_change)
+
+
+def _search_index():
+    from utils.search_index import SearchIndex
+    version = table_version('courses')
+    with _STORE_LOCK:
+        if _SEARCH['index'] is None or _SEARCH['version'] != version:
+            _SEARCH['index'] = SearchIndex.from_frame(load_columns('courses', SEARCH_COLUMNS))
+            _SEARCH['version'] = version
+        return _SEARCH['index']
+
+
+def search_courses(query, limit=None):
+    """Return ids of courses matching query (title, instructor, description), best first."""
+    with _STORE_LOCK:
+        return _search_index().search(query, limit)
+
+
+# -------------------------
+# Course records
+# -------------------------
+# Pages and scripts iterate courses as compact, typed tuples instead of one
+# pandas Series per row (iterrows). The tuple is built once per courses
+# version with column-wise conversions and shared by every session.
+COURSE_FIELDS = ('id', 'title', 'description', 'instructor', 'thumbnail', 'asset_path')
+
+
+class CourseRecord(namedtuple('CourseRecord', COURSE_FIELDS)):
+    """One course: id is an int, every other field a str ('' when missing)."""
+    __slots__ = ()
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+
+_RECORDS = {'version': None, 'records': (), 'by_id': types.MappingProxyType({})}
+
+
+def _build_records(courses):
+    n = len(courses)
+    if n == 0:
+        return ()
+    cols = []
+    for field in COURSE_FIELDS:
+        if field not in courses.columns:
+            cols.append([0 if field == 'id' else ''] * n)
+        elif field == 'id':
+            cols.append(pd.to_numeric(courses['id'], errors='coerce')
+                        .fillna(-1).astype('int64').tolist())
+        else:
+            col = courses[field]
+            cols.append(col.where(col.notna(), '').astype(str).tolist())
+    return tuple(map(CourseRecord._make, zip(*cols)))
+
+
+def _records_for(courses, version):
+    with _STORE_LOCK:
+        if _RECORDS['version'] != version:
+            records = _build_records(courses)
+            _RECORDS.update(version=version, records=records,
+                            by_id=types.MappingProxyType({r.id: r for r in records}))
+        return _RECORDS['records']
+
+
+def course_records():
+    """All courses as a tuple of CourseRecord, in table (row position) order."""
+    version = table_version('courses')
+    with _STORE_LOCK:
+        return _records_for(_load_table('courses'), version)
+
+
+def course_record_map():
+    """Read-only {course id: CourseRecord} for the current courses version."""
+    course_records()
+    return _RECORDS['by_id']
+
+
+# -------------------------
+# Paged catalog queries
+# -------------------------
+# Sort orders are computed once per courses version as arrays of row
+# positions, together with each order's inverse (row position -> rank) and
+# a course id -> row position map. A page request is a slice; with a
+# search it is O(matches): look up the matching rows, sort their ranks and
+# slice -- no per-rerun copy, sort or scan of the catalog.
+COURSE_SORT_KEYS = {'Newest': None, 'Title A→Z': 'title', 'Instructor': 'instructor'}
+
+_ORDERS = {'version': None, 'orders': {}, 'ranks': {}, 'positions': None}
+
+
+def _orders_for(courses, version):
+    if _ORDERS['version'] != version:
+        _ORDERS.update(version=version, orders={}, ranks={}, positions=None)
+    return _ORDERS
+
+
+def _course_order(sort_key, courses, version):
+    orders = _orders_for(courses, version)['orders']
+    order = orders.get(sort_key)
+    if order is None:
+        col = COURSE_SORT_KEYS[sort_key]
+        if col is None or col not in courses.columns:
+            order = np.arange(len(courses))
+        else:
+            order = courses[col].reset_index(drop=True).sort_values(
+                na_position='last', kind='mergesort').index.to_numpy()
+        order.setflags(write=False)
+        orders[sort_key] = order
+    return order
+
+
+def _course_ranks(sort_key, courses, version):
+    """Inverse of the sort order: ranks[row position] = place in the order."""
+    order = _course_order(sort_key, courses, version)
+    ranks = _ORDERS['ranks'].get(sort_key)
+    if ranks is None:
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        ranks.setflags(write=False)
+        _ORDERS['ranks'][sort_key] = ranks
+    return ranks
+
+
+def _course_positions(courses, version):
+    """{course id: row position} for the current courses version (first row wins)."""
+    state = _orders_for(courses, version)
+    if state['positions'] is None:
+        ids = pd.to_numeric(courses['id'], errors='coerce') if 'id' in courses else pd.Series(dtype=float)
+        positions = {}
+        for pos, cid in enumerate(ids.tolist()):
+            if cid == cid:  # skip NaN
+                positions.setdefault(int(cid), pos)
+        state['positions'] = positions
+    return state['positions']
+
+
+def query_courses(text=None, sort_key='Newest', offset=0, limit=None, as_records=False):
+    """Return (page DataFrame, total matches) for one page of the catalog.
+
+    - text:     search box contents (see search_courses); empty = everything
+    - sort_key: one of COURSE_SORT_KEYS ('Newest' keeps catalog order);
+                anything else raises ValueError
+    - offset, limit: slice of the sorted matches; limit=None means all
+    - as_records: return the page as a list of CourseRecord instead
+    """
+    if sort_key not in COURSE_SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort_key!r}")
+    matches = search_courses(text) if text else None
+    version = table_version('courses')
+    with _STORE_LOCK:
+        courses = _load_table('courses')
+        order = _course_order(sort_key, courses, version)
+        if matches is not None:
+            positions = _course_positions(courses, version)
+            ranks = _course_ranks(sort_key, courses, version)
+            hits = np.fromiter((positions[c] for c in matches if c in positions),
+                               dtype=np.int64)
+            # O(matches log matches): the matching rows, in sort order
+            order = order[np.sort(ranks[hits])]
+        records = _records_for(courses, version) if as_records else None
+    total = len(order)
+    end = total if limit is None else offset + max(0, int(limit))
+    if as_records:
+        return [records[i] for i in order[offset:end].tolist()], total
+    page = courses.iloc[order[offset:end]].reset_index(drop=True)
+    return page, total
+
+
+# -------------------------
+# Popularity counters
+# -------------------------
+# Enrollments per course, kept in memory and patched by enroll_user /
+# delete_course instead of running value_counts() on every render. Only
+# courses that still exist are counted. A snapshot (POPULARITY_SNAPSHOT)
+# is saved every POPULARITY_SNAPSHOT_EVERY changes and at exit; it is
+# reused at startup only if both CSVs are byte-for-byte unchanged since,
+# otherwise the counters are rebuilt from the enrollments table.
+POPULARITY_SNAPSHOT_EVERY = 100
+
+_POPULARITY = {'counts': None, 'courses': set(), 'enroll_version': None,
+               'course_version': None, 'dirty': 0}
+
+
+def _existing_course_ids():
+    courses = load_columns('courses', ('id',))
+    if courses.empty:
+        return set()
+    return set(pd.to_numeric(courses['id'], errors='coerce').dropna().astype('int64').tolist())
+
+
+def _recount_popularity(existing=None):
+    enroll = load_columns('enrollments', ('course_id',))
+    if existing is None:
+        existing = _existing_course_ids()
+    if enroll.empty or not existing:
+        return Counter()
+    course_ids = pd.to_numeric(enroll['course_id'], errors='coerce').dropna().astype('int64')
+    counts = course_ids[course_ids.isin(list(existing))].value_counts()
+    return Counter({int(k): int(v) for k, v in counts.items()})
+
+
+def _csv_sigs():
+    return [_file_sig(_table_path('enrollments')), _file_sig(_table_path('courses'))]
+
+
+def _load_popularity_snapshot():
+    if _store() is not None:
+        return None
+    try:
+        snap = json.loads(POPULARITY_SNAPSHOT.read_text(encoding='utf-8'))
+    except Exception:
+        return None
+    if [tuple(s) if s else None for s in snap.get('sigs', [])] != _csv_sigs():
+        return None
+    return Counter({int(k): int(v) for k, v in snap.get('counts', {}).items()})
+
+
+def save_popularity_snapshot():
+    """Persist the current counters (no-op until they have been built)."""
+    with _STORE_LOCK:
+        counts = _POPULARITY['counts']
+        if counts is None or _store() is not None:
+            return
+        snap = {'sigs': _csv_sigs(), 'counts': {str(k): v for k, v in counts.items() if v}}
+        _POPULARITY['dirty'] = 0
+    try:
+        write_coordinator.atomic_write_text(POPULARITY_SNAPSHOT, json.dumps(snap))
+    except Exception:
+        pass
+
+
+atexit.register(save_popularity_snapshot)
+
+
+def _popularity_changed():
+    _POPULARITY['dirty'] += 1
+    if _POPULARITY['dirty'] >= POPULARITY_SNAPSHOT_EVERY:
+        save_popularity_snapshot()
+
+
+def _popularity_on_enroll(old, new, events):
+    counts = _POPULARITY['counts']
+    if counts is None or _POPULARITY['enroll_version'] != old:
+        return
+    for kind, payload in events:
+        if kind in ('insert', 'delete') and isinstance(payload, dict):
+            cid = int(payload['course_id'])
+            if cid in _POPULARITY['courses']:
+                counts[cid] += 1 if kind == 'insert' else -1
+        else:
+            _POPULARITY['counts'] = None
+            return
+    _POPULARITY['enroll_version'] = new
+    _popularity_changed()
+
+
+def _popularity_on_course(old, new, events):
+    counts = _POPULARITY['counts']
+    if counts is None or _POPULARITY['course_version'] != old:
+        return
+    for kind, payload in events:
+        if kind == 'insert':
+            _POPULARITY['courses'].add(int(payload['id']))
+        elif kind == 'delete':
+            _POPULARITY['courses'].discard(int(payload))
+            counts.pop(int(payload), None)
+        elif kind == 'reset':
+            _POPULARITY['counts'] = None
+            return
+    _POPULARITY['course_version'] = new
+    _popularity_changed()
+
+
+on_table_change('enrollments', _popularity_on_enroll)
+on_table_change('courses', _popularity_on_course)
+
+
+def popularity_map():
+    """Return a read-only {course_id: enrollment count} mapping (O(1) when current)."""
+    enroll_version = table_version('enrollments')
+    course_version = table_version('courses')
+    with _STORE_LOCK:
+        if (_POPULARITY['counts'] is None
+                or _POPULARITY['enroll_version'] != enroll_version
+                or _POPULARITY['course_version'] != course_version):
+            existing = _existing_course_ids()
+            counts = _load_popularity_snapshot()
+            if counts is None:
+                counts = _recount_popularity(existing)
+                _POPULARITY['dirty'] = POPULARITY_SNAPSHOT_EVERY
+            _POPULARITY.update(counts=counts, courses=existing,
+                               enroll_version=enroll_version, course_version=course_version)
+            if _POPULARITY['dirty'] >= POPULARITY_SNAPSHOT_EVERY:
+                save_popularity_snapshot()
+        return types.MappingProxyType(_POPULARITY['counts'])
+
+
+def check_popularity_consistency():
+    """Compare the live counters with a full recount.
+
+    Returns {course_id: (counter value, recounted value)} for every
+    mismatch; an empty dict means the counters are consistent.
+    """
+    live = dict(popularity_map())
+    with _STORE_LOCK:
+        actual = _recount_popularity()
+    mismatches = {}
+    for cid in set(live) | set(actual):
+        if live.get(cid, 0) != actual.get(cid, 0):
+            mismatches[cid] = (live.get(cid, 0), actual.get(cid, 0))
+    return mismatches
+
+
+# -------------------------
+# Uploaded asset (blob) index
+# -------------------------
+# Uploaded files are content-addressed by SHA-256. BLOB_INDEX maps each
+# digest to its size, original file name (first upload wins; used as the
+# download name), staged local path and remote URL, so a re-upload of
+# the same bytes (under any name) skips the write and/or the transfer.
+# Dedup hits and bytes saved are counted alongside. The file is shared by
+# every process on the data dir: it is re-read whenever its signature
+# changes, and each update is merged into the current file under its lock.
+_BLOB_LOCK = threading.Lock()
+_BLOBS = {'entries': {}, 'stats': {}, 'sig': False}
+
+
+def _read_blobs():
+    try:
+        snap = json.loads(BLOB_INDEX.read_text(encoding='utf-8'))
+    except Exception:
+        snap = {}
+    stats = dict({'local_hits': 0, 'remote_hits': 0, 'misses': 0,
+                  'disk_bytes_saved': 0, 'transfer_bytes_saved': 0,
+                  'bytes_uploaded': 0},
+                 **snap.get('stats', {}))
+    return snap.get('blobs', {}), stats
+
+
+def _blob_state():
+    """The current index (call with _BLOB_LOCK held); re-read if the file changed."""
+    sig = _file_sig(BLOB_INDEX)
+    if sig != _BLOBS['sig']:
+        _BLOBS['entries'], _BLOBS['stats'] = _read_blobs()
+        _BLOBS['sig'] = sig
+    return _BLOBS
+
+
+def find_blob(digest):
+    """Return the index entry for a SHA-256 hex digest ({'size', 'name', 'local', 'url'}), or None."""
+    with _BLOB_LOCK:
+        entry = _blob_state()['entries'].get(digest)
+        return dict(entry) if entry is not None else None
+
+
+def record_blob(digest, size, local=None, url=None, hit=None, name=None):
+    """Add/extend a blob entry and count the outcome.
+
+    name is the file name the bytes were uploaded as (kept from the first
+    upload that gives one).
+
+    hit is 'local' (bytes already staged on disk, write skipped), 'remote'
+    (already in the bucket, transfer skipped), 'miss' (transferred) or None
+    (just record the location).
+    """
+    with _BLOB_LOCK, write_coordinator.table_lock(BLOB_INDEX):
+        entries, stats = _read_blobs()
+        entry = entries.setdefault(digest, {'size': int(size)})
+        if local:
+            entry['local'] = str(local)
+        if url:
+            entry['url'] = url
+        if name:
+            entry.setdefault('name', str(name))
+        if hit == 'local':
+            stats['local_hits'] += 1
+            stats['disk_bytes_saved'] += int(size)
+        elif hit == 'remote':
+            stats['remote_hits'] += 1
+            stats['transfer_bytes_saved'] += int(size)
+        elif hit == 'miss':
+            stats['misses'] += 1
+            stats['bytes_uploaded'] += int(size)
         try:
-            next_id = int(enroll['id'].astype(int).max()) + 1
+            write_coordinator.atomic_write_text(
+                BLOB_INDEX, json.dumps({'blobs': entries, 'stats': stats},
+                                       indent=1, sort_keys=True))
         except Exception:
-            next_id = len(enroll) + 1
+            return
+        _BLOBS.update(entries=entries, stats=stats, sig=_file_sig(BLOB_INDEX))
 
-    new_row = {'id': int(next_id), 'user_id': int(
-        user_id), 'course_id': int(course_id)}
-    enroll = pd.concat([enroll, pd.DataFrame([new_row])], ignore_index=True)
-    save_enrollments(enroll)
-    return True
+
+def blob_stats():
+    """Dedup counters, the transfer hit rate and the number of distinct blobs."""
+    with _BLOB_LOCK:
+        state = _blob_state()
+        stats = dict(state['stats'])
+        stats['blobs'] = len(state['entries'])
+    transfers = stats['remote_hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['remote_hits'] / transfers, 3) if transfers else None
+    return stats
 
 
 # -------------------------
 # Helpers used by pages
 # -------------------------
-def my_courses_for_user(user_id):
-    """Return DataFrame of courses the given user_id is enrolled in."""
-    ensure_data_files()
+def my_course_records(user_id):
+    """CourseRecords the given user_id is enrolled in, ordered by course id.
+
+    A lookup in the enrollment index joined against the course id map:
+    O(k) in the user's enrollments, not in the size of either table.
+    """
     try:
         uid = int(user_id)
     except Exception:
         try:
             uid = int(getattr(user_id, 'id'))
         except Exception:
-            return pd.DataFrame()
+            return []
 
-    enroll = load_enrollments()
-    if enroll.empty:
-        return pd.DataFrame()
+    store = _store()
+    if store is not None:
+        return list(_build_records(store.my_courses(uid)))
 
-    try:
-        enroll = enroll.astype(
-            {'user_id': 'int64', 'course_id': 'int64', 'id': 'int64'})
-    except Exception:
-        enroll['user_id'] = pd.to_numeric(
-            enroll['user_id'], errors='coerce').fillna(-1).astype(int)
-        enroll['course_id'] = pd.to_numeric(
-            enroll['course_id'], errors='coerce').fillna(-1).astype(int)
+    by_id = course_record_map()
+    return [by_id[cid] for cid in sorted(enrolled_course_ids(uid)) if cid in by_id]
 
-    user_rows = enroll[enroll['user_id'] == uid]
-    if user_rows.empty:
-        return pd.DataFrame()
 
-    courses = load_courses()
-    if courses.empty:
+def my_courses_for_user(user_id):
+    """Return DataFrame of courses the given user_id is enrolled in."""
+    records = my_course_records(user_id)
+    if not records:
         return pd.DataFrame()
+    return pd.DataFrame.from_records(records, columns=COURSE_FIELDS)
+
+
+def _purge_course_enrollments(course_id):
+    """Drop every enrollment in course_id (one rewrite); return how many."""
+    cid = int(course_id)
 
-    courses['id'] = pd.to_numeric(courses['id'], errors='coerce')
-    course_ids = user_rows['course_id'].astype(int).tolist()
-    return courses[courses['id'].isin(course_ids)].reset_index(drop=True)
+    def mutation(enroll):
+        if enroll.empty:
+            return enroll, 0
+        hit = pd.to_numeric(enroll['course_id'], errors='coerce') == cid
+        if not hit.any():
+            return enroll, 0
+        for rec in enroll.loc[hit].to_dict(orient='records'):
+            _emit('enrollments', 'delete', rec)
+        return enroll.loc[~hit].reset_index(drop=True), int(hit.sum())
+
+    with _LOG_LOCK:
+        purged = _commit('enrollments', mutation)
+        _log_state['sig'] = None
+        return purged
 
 
 def delete_course(course_id):
-    ensure_data_files()
-    courses = load_courses()
-    if courses.empty:
-        return False
-    courses = courses[courses['id'] != int(course_id)]
-    courses.to_csv(COURSES, index=False)
-    return True
+    """Delete a course together with its enrollments.
+
+    Enrollments go first, so a new course that later gets the same id
+    (add_course uses max(id) + 1) never inherits students, counts or a
+    place in anyone's My Courses.
+    """
+    store = _store()
+    if store is not None:
+        found = store.delete_course(course_id)
+        if found:
+            _forget('enrollments')
+            _forget('courses', [('delete', int(course_id))])
+        return found
+
+    _purge_course_enrollments(course_id)
+
+    def mutation(courses):
+        if courses.empty:
+            return courses, False
+        kept = courses[courses['id'] != int(course_id)]
+        if len(kept) == len(courses):
+            return courses, True
+        _emit('courses', 'delete', int(course_id))
+        return kept, True
+
+    return _commit('courses', mutation)
 # ---------------------------------------------------------
 # Backwards compatibility wrapper (some pages expect enroll())
 # ---------------------------------------------------------
@@ -163,3 +1246,33 @@ def delete_course(course_id):
 def enroll(user_id, course_id):
     """Compatibility wrapper for pages that call enroll()."""
     return enroll_user(user_id, course_id)
+
+
+# -------------------------
+# Warm start
+# -------------------------
+WARM_STEPS = ('tables', 'course_records', 'search_index', 'enrollment_index',
+              'user_index', 'popularity')
+
+
+def warm_caches(steps=WARM_STEPS):
+    """Load the tables and build derived indexes now instead of on first use.
+
+    steps is a subset of WARM_STEPS (run in that order). Returns
+    {step: seconds}. Used by utils/warmup.py at process start.
+    """
+    actions = {
+        'tables': lambda: [table_version(name) for name in ('courses', 'users', 'enrollments')],
+        'course_records': course_record_map,
+        'search_index': _search_index,
+        'enrollment_index': _enrolled_index,
+        'user_index': lambda: _store() is None and _user_index(),
+        'popularity': popularity_map,
+    }
+    timings = {}
+    for name in WARM_STEPS:
+        if name in steps:
+            t0 = time.perf_counter()
+            actions[name]()
+            timings[name] = time.perf_counter() - t0
+    return timings
@@ -0,0 +1,225 @@
+# utils/metrics.py
+"""
+Lightweight in-process timing spans for the app's hot paths.
+
+    with metrics.span("data_io.read_csv.courses"):
+        ...
+
+    @metrics.timed("auth.login")
+    def login_user(...): ...
+
+Each span name keeps a count, a running total and its last WINDOW
+durations; snapshot() turns the window into rolling p50/p95/p99. Spans
+that finish between begin_rerun() and end_rerun() on the same thread
+(Streamlit runs each script in its own thread) also go into that rerun's
+breakdown.
+
+Export with to_prometheus() or to_json(). With ELEARN_METRICS_FILE set, the
+Prometheus text is also written there at most every EXPORT_INTERVAL
+seconds, for a node_exporter textfile collector. ELEARN_METRICS=0 turns
+every span into a no-op.
+"""
+import os
+import json
+import math
+import time
+import threading
+import functools
+from collections import deque
+
+ENABLED = os.getenv("ELEARN_METRICS", "1").strip().lower() not in ("0", "false", "no")
+WINDOW = int(os.getenv("ELEARN_METRICS_WINDOW", "1024"))
+EXPORT_FILE = os.getenv("ELEARN_METRICS_FILE", "").strip() or None
+EXPORT_INTERVAL = float(os.getenv("ELEARN_METRICS_EXPORT_INTERVAL", "15"))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_perf = time.perf_counter
+_lock = threading.Lock()
+_series = {}                  # span name -> [count, total seconds, deque of recent seconds]
+_local = threading.local()    # .trace: [(name, seconds)] for the rerun running on this thread
+_last_export = [0.0]
+
+# -------------------------
+# Recording
+# -------------------------
+
+
+def set_enabled(flag):
+    global ENABLED
+    ENABLED = bool(flag)
+
+
+def observe(name, seconds):
+    """Record one duration (seconds) for a span name."""
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = [0, 0.0, deque(maxlen=WINDOW)]
+        series[0] += 1
+        series[1] += seconds
+        series[2].append(seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.append((name, seconds))
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = _perf()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, _perf() - self.t0)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing its block under name."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator timing every call of the function under name."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            t0 = _perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, _perf() - t0)
+        return wrapper
+    return decorate
+
+# -------------------------
+# Per-rerun breakdown
+# -------------------------
+
+
+def begin_rerun():
+    """Start collecting this thread's spans for one script run."""
+    if ENABLED:
+        _local.trace = []
+        _local.started = _perf()
+
+
+def end_rerun():
+    """
+    Stop collecting and return {"total_ms", "spans": {name: {"count",
+    "ms"}}} for the run (None if begin_rerun() wasn't called). The total
+    is also recorded as the "rerun" span.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    _local.trace = None
+    total = _perf() - _local.started
+    observe("rerun", total)
+    spans = {}
+    for name, seconds in trace:
+        entry = spans.setdefault(name, {"count": 0, "ms": 0.0})
+        entry["count"] += 1
+        entry["ms"] += seconds * 1000
+    for entry in spans.values():
+        entry["ms"] = round(entry["ms"], 3)
+    maybe_export()
+    return {"total_ms": round(total * 1000, 3),
+            "spans": dict(sorted(spans.items(), key=lambda kv: -kv[1]["ms"]))}
+
+# -------------------------
+# Snapshots & export
+# -------------------------
+
+
+def _quantile(ordered, q):
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def snapshot():
+    """Return {name: {"count", "sum_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}."""
+    with _lock:
+        items = [(name, s[0], s[1], sorted(s[2])) for name, s in _series.items()]
+    out = {}
+    for name, count, total, window in sorted(items):
+        row = {"count": count, "sum_ms": round(total * 1000, 3),
+               "mean_ms": round(total * 1000 / count, 3) if count else 0.0}
+        for q in QUANTILES:
+            row[f"p{int(q * 100)}_ms"] = round(_quantile(window, q) * 1000, 3) if window else 0.0
+        row["max_ms"] = round(window[-1] * 1000, 3) if window else 0.0
+        out[name] = row
+    return out
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+def to_json():
+    return json.dumps({"generated_at": time.time(), "window": WINDOW,
+                       "spans": snapshot()}, indent=2)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus():
+    """Prometheus text exposition: one summary, labelled by span name."""
+    lines = ["# HELP elearn_span_seconds Duration of instrumented code paths.",
+             "# TYPE elearn_span_seconds summary"]
+    with _lock:
+        items = [(name, s[0], s[1], sorted(s[2])) for name, s in _series.items()]
+    for name, count, total, window in sorted(items):
+        label = _label(name)
+        for q in QUANTILES:
+            if window:
+                lines.append(f'elearn_span_seconds{{span="{label}",quantile="{q}"}} '
+                             f'{_quantile(window, q):.6f}')
+        lines.append(f'elearn_span_seconds_sum{{span="{label}"}} {total:.6f}')
+        lines.append(f'elearn_span_seconds_count{{span="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """Write to_prometheus() atomically to path (default ELEARN_METRICS_FILE)."""
+    path = path or EXPORT_FILE
+    if not path:
+        return None
+    from utils.write_coordinator import atomic_write_text
+    atomic_write_text(path, to_prometheus())
+    return path
+
+
+def maybe_export():
+    """write_prometheus() if ELEARN_METRICS_FILE is set and EXPORT_INTERVAL has passed."""
+    if not EXPORT_FILE:
+        return
+    now = time.monotonic()
+    if now - _last_export[0] < EXPORT_INTERVAL:
+        return
+    _last_export[0] = now
+    try:
+        write_prometheus()
+    except Exception as e:
+        print("Metrics export failed:", e)
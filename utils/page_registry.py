@@ -0,0 +1,68 @@
+# utils/page_registry.py
+"""
+Process-wide registry of page modules (pages.pN_*).
+
+streamlit_app.py is re-executed on every rerun, so this state lives in an
+imported module: each page is imported once per process and reused by every
+session. With ELEARN_DEV_RELOAD=1 a page is reloaded only when its source
+file's mtime changes (hot reload while editing).
+"""
+import os
+import time
+import importlib
+import threading
+
+DEV_RELOAD = os.getenv("ELEARN_DEV_RELOAD", "").strip().lower() in ("1", "true", "yes")
+
+_lock = threading.Lock()
+_pages = {}  # page name -> {"module", "mtime", "imports", "reloads", "import_seconds"}
+
+
+def _mtime(module):
+    try:
+        return os.stat(module.__file__).st_mtime_ns
+    except (OSError, TypeError, AttributeError):
+        return None
+
+
+def get_page(name):
+    """Return the imported pages.<name> module, importing it on first use."""
+    entry = _pages.get(name)
+    if entry is not None and not DEV_RELOAD:
+        return entry["module"]
+
+    with _lock:
+        entry = _pages.get(name)
+        if entry is None:
+            t0 = time.perf_counter()
+            module = importlib.import_module(f"pages.{name}")
+            entry = {"module": module, "mtime": _mtime(module), "imports": 1,
+                     "reloads": 0, "import_seconds": time.perf_counter() - t0}
+            _pages[name] = entry
+        elif DEV_RELOAD:
+            mtime = _mtime(entry["module"])
+            if mtime != entry["mtime"]:
+                t0 = time.perf_counter()
+                entry["module"] = importlib.reload(entry["module"])
+                entry["mtime"] = mtime
+                entry["reloads"] += 1
+                entry["import_seconds"] += time.perf_counter() - t0
+        return entry["module"]
+
+
+def preload(names):
+    """Import every named page now; return {name: error message} for failures."""
+    errors = {}
+    for name in names:
+        try:
+            get_page(name)
+        except Exception as e:
+            errors[name] = str(e)
+    return errors
+
+
+def stats():
+    """Return {page name: {"imports", "reloads", "import_seconds"}}."""
+    with _lock:
+        return {name: {k: v for k, v in entry.items() if k not in ("module", "mtime")}
+                for name, entry in _pages.items()}
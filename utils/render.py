@@ -0,0 +1,134 @@
+# utils/render.py
+"""
+Shared, memoized HTML for course cards.
+
+- placeholder_dataurl(label): the "no image" SVG, built and URL-quoted once
+  per label
+- local_file_exists(path): os.path.exists with a short TTL, so a rerun of a
+  12-card page doesn't stat every thumbnail again
+- card_html(course, badges_html): rendered card fragments in an LRU keyed
+  by (course id, row version, thumbnail derivative digest, badges). Row
+  versions are bumped from the courses change events in utils/data_io,
+  so editing one course only re-renders that card; the digest makes a
+  card switch to its resized thumbnails (utils/thumbnails.py) as soon as
+  they are built.
+"""
+import os
+import time
+import threading
+import urllib.parse
+from functools import lru_cache
+from collections import OrderedDict
+
+from utils import metrics, thumbnails
+from utils.data_io import on_table_change
+
+CARD_CACHE_SIZE = int(os.getenv("ELEARN_CARD_CACHE_SIZE", "512"))
+EXISTS_TTL = 5.0        # seconds a file-existence answer is reused
+PLACEHOLDER_LABEL_LEN = 30
+
+_lock = threading.Lock()
+_cards = OrderedDict()  # (epoch, id, row version, derivative digest, badges) -> html
+_row_versions = {}      # course id -> int
+_epoch = [0]            # bumped when the whole table was replaced
+_exists = {}            # path -> (checked at, bool)
+_stats = {"hits": 0, "misses": 0}
+
+# -------------------------
+# Placeholders / thumbnails
+# -------------------------
+
+
+@lru_cache(maxsize=1024)
+def placeholder_dataurl(label="No image"):
+    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="600" height="360">
+      <rect width="100%" height="100%" fill="#F1F5F9"/>
+      <text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="#64748B" font-family="Arial, sans-serif" font-size="22">{label}</text>
+    </svg>'''
+    return "data:image/svg+xml;utf8," + urllib.parse.quote(svg)
+
+
+def local_file_exists(path):
+    """os.path.exists(path), cached for EXISTS_TTL seconds."""
+    now = time.monotonic()
+    hit = _exists.get(path)
+    if hit is not None and now - hit[0] < EXISTS_TTL:
+        return hit[1]
+    try:
+        found = os.path.exists(path)
+    except (TypeError, ValueError):
+        found = False
+    if len(_exists) > 4096:
+        _exists.clear()
+    _exists[path] = (now, found)
+    return found
+
+
+def choose_thumb(thumb, title):
+    """The course's thumbnail value, or a placeholder carrying its title."""
+    if thumb and isinstance(thumb, str) and thumb.strip():
+        return thumb
+    label = str(title or "")[:PLACEHOLDER_LABEL_LEN] or "No image"
+    return placeholder_dataurl(label)
+
+# -------------------------
+# Card cache
+# -------------------------
+
+
+def _on_courses_change(old, new, events):
+    with _lock:
+        for kind, payload in events:
+            if kind == 'reset':
+                _epoch[0] += 1
+                _row_versions.clear()
+                _cards.clear()
+                continue
+            cid = payload.get('id') if isinstance(payload, dict) else payload
+            try:
+                cid = int(cid)
+            except (TypeError, ValueError):
+                continue
+            _row_versions[cid] = _row_versions.get(cid, 0) + 1
+
+
+on_table_change('courses', _on_courses_change)
+
+
+def card_html(course, badges_html=""):
+    """
+    Card HTML for a course row (dict or Series with id/title/description/
+    thumbnail), served from the LRU while that row is unchanged.
+    """
+    from utils.ui import course_card_html
+
+    try:
+        cid = int(course.get("id"))
+    except (TypeError, ValueError):
+        cid = None
+    title = course.get("title") or "Untitled Course"
+    if cid is None:
+        return course_card_html(title, course.get("description") or "",
+                                choose_thumb(course.get("thumbnail"), title), badges_html)
+    derivs = thumbnails.derivative_key(course.get("thumbnail"))
+    with _lock:
+        key = (_epoch[0], cid, _row_versions.get(cid, 0), derivs, badges_html)
+        cached = _cards.get(key)
+        if cached is not None:
+            _cards.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+        _stats["misses"] += 1
+    with metrics.span("render.card_miss"):
+        fragment = course_card_html(title, course.get("description") or "",
+                                    choose_thumb(course.get("thumbnail"), title), badges_html)
+    with _lock:
+        _cards[key] = fragment
+        while len(_cards) > CARD_CACHE_SIZE:
+            _cards.popitem(last=False)
+    return fragment
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, cards=len(_cards), placeholders=placeholder_dataurl.cache_info().currsize)
@@ -0,0 +1,138 @@
+# utils/search_index.py
+"""
+In-memory inverted index for the course catalog search box.
+
+Documents are courses; title, instructor and description are tokenized
+into lowercase words. A query token matches an indexed word exactly, as a
+prefix (binary search over the sorted vocabulary), or as an infix through a
+trigram index (3+ characters, mirroring the old substring search). Every
+query token must match; courses are ranked by summed field weights.
+"""
+import re
+import bisect
+from collections import defaultdict
+
+FIELD_WEIGHTS = (("title", 3.0), ("instructor", 2.0), ("description", 1.0))
+EXACT, PREFIX, INFIX = 1.0, 0.7, 0.4
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    if text is None or not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)   # word -> {course_id: field weight}
+        self.docs = {}                      # course_id -> set of words
+        self.vocab = []                     # sorted words, for prefix lookup
+        self.grams = defaultdict(set)       # trigram -> words containing it
+
+    @classmethod
+    def from_frame(cls, df):
+        idx = cls()
+        if df is None or df.empty or "id" not in df.columns:
+            return idx
+        cols = [c for c, _ in FIELD_WEIGHTS]
+        frame = df.reindex(columns=["id"] + cols)
+        for rec in frame.to_dict(orient="records"):
+            idx.add_course(rec)
+        return idx
+
+    # -------------------------
+    # Incremental maintenance
+    # -------------------------
+    def add_course(self, course):
+        """Index (or re-index) one course given as a dict with id/title/...."""
+        try:
+            cid = int(course.get("id"))
+        except (TypeError, ValueError):
+            return
+        self.remove(cid)
+        words = {}
+        for field, weight in FIELD_WEIGHTS:
+            for word in tokenize(course.get(field)):
+                words[word] = max(words.get(word, 0.0), weight)
+        for word, weight in words.items():
+            if word not in self.postings:
+                bisect.insort(self.vocab, word)
+                for g in _trigrams(word):
+                    self.grams[g].add(word)
+            self.postings[word][cid] = weight
+        self.docs[cid] = set(words)
+
+    def remove(self, course_id):
+        try:
+            cid = int(course_id)
+        except (TypeError, ValueError):
+            return
+        for word in self.docs.pop(cid, ()):
+            posting = self.postings.get(word)
+            if posting is None:
+                continue
+            posting.pop(cid, None)
+            if not posting:
+                del self.postings[word]
+                i = bisect.bisect_left(self.vocab, word)
+                if i < len(self.vocab) and self.vocab[i] == word:
+                    del self.vocab[i]
+                for g in _trigrams(word):
+                    self.grams[g].discard(word)
+                    if not self.grams[g]:
+                        del self.grams[g]
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def _matches(self, token):
+        """Yield (word, match weight) for every indexed word the token matches."""
+        seen = set()
+        if token in self.postings:
+            seen.add(token)
+            yield token, EXACT
+        i = bisect.bisect_left(self.vocab, token)
+        while i < len(self.vocab) and self.vocab[i].startswith(token):
+            word = self.vocab[i]
+            if word not in seen:
+                seen.add(word)
+                yield word, PREFIX
+            i += 1
+        if len(token) >= 3:
+            grams = sorted(_trigrams(token), key=lambda g: len(self.grams.get(g, ())))
+            candidates = set(self.grams.get(grams[0], ()))
+            for g in grams[1:]:
+                if not candidates:
+                    break
+                candidates &= self.grams.get(g, set())
+            for word in candidates:
+                if word not in seen and token in word:
+                    yield word, INFIX
+
+    def search(self, query, limit=None):
+        """Return course ids matching every token of query, best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return sorted(self.docs)
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for word, match in self._matches(token):
+                for cid, weight in self.postings[word].items():
+                    s = match * weight
+                    if s > token_scores.get(cid, 0.0):
+                        token_scores[cid] = s
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {cid: scores[cid] + s for cid, s in token_scores.items() if cid in scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda cid: (-scores[cid], cid))
+        return ranked[:limit] if limit else ranked
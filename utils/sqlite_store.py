@@ -0,0 +1,263 @@
+# utils/sqlite_store.py
+"""SQLite storage backend for courses, users and enrollments.
+
+Enabled with ELEARN_STORAGE=sqlite (see utils/data_io.py). The database
+runs in WAL mode so readers never block the writer, and the lookups the
+pages need are index-backed:
+
+- users.username (UNIQUE)      -> login / role lookups, one row per name
+- enrollments(user_id, course_id) -> My Courses
+- courses.id (INTEGER PRIMARY KEY) -> course joins
+"""
+import os
+import sqlite3
+import threading
+import pandas as pd
+from pathlib import Path
+
+COLUMNS = {
+    'courses': ['id', 'title', 'description', 'instructor', 'thumbnail', 'asset_path'],
+    'users': ['id', 'username', 'password', 'role'],
+    'enrollments': ['id', 'user_id', 'course_id'],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    instructor TEXT,
+    thumbnail TEXT,
+    asset_path TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT,
+    role TEXT
+);
+CREATE TABLE IF NOT EXISTS enrollments (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_enrollments_user_course ON enrollments(user_id, course_id);
+"""
+
+
+class SQLiteStore:
+    """Thread-safe wrapper around one SQLite database file.
+
+    Each thread gets its own connection. Whole-table reads are cached and
+    reused until the database (or its WAL) changes on disk.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._cache = {}     # table name -> (sig, DataFrame)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            self._ensure_unique_usernames(conn)
+
+    @staticmethod
+    def _ensure_unique_usernames(conn):
+        """Create the UNIQUE username index (replacing the old plain one)."""
+        try:
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_unique '
+                         'ON users(username)')
+            conn.execute('DROP INDEX IF EXISTS idx_users_username')
+        except sqlite3.IntegrityError:
+            # an older database already holds duplicate names: keep a plain
+            # index until they are cleaned up; add_user still checks first
+            print("sqlite_store: duplicate usernames in users, UNIQUE index not created")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
+
+    # -------------------------
+    # Connections
+    # -------------------------
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _sig(self):
+        sig = []
+        for p in (self.path, Path(f'{self.path}-wal')):
+            try:
+                st = os.stat(p)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _changed(self, *tables):
+        with self._lock:
+            for name in tables:
+                self._cache.pop(name, None)
+
+    # -------------------------
+    # Whole-table access
+    # -------------------------
+    def load_table(self, name):
+        """Return the whole table as a DataFrame (cached until the DB changes)."""
+        sig = self._sig()
+        with self._lock:
+            hit = self._cache.get(name)
+            if hit is not None and hit[0] == sig:
+                return hit[1]
+            cols = ', '.join(COLUMNS[name])
+            df = pd.read_sql_query(
+                f'SELECT {cols} FROM {name} ORDER BY id', self._conn())
+            self._cache[name] = (sig, df)
+            return df
+
+    def replace_table(self, name, df):
+        """Replace every row of a table with the rows of df."""
+        cols = COLUMNS[name]
+        frame = df.reindex(columns=cols).astype(object)
+        frame = frame.where(pd.notna(frame), None)
+        conn = self._conn()
+        with conn:
+            conn.execute(f'DELETE FROM {name}')
+            conn.executemany(
+                f'INSERT INTO {name} ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})',
+                frame.itertuples(index=False, name=None))
+        self._changed(name)
+
+    # -------------------------
+    # Courses
+    # -------------------------
+    def add_course(self, title, description, instructor, thumbnail='', asset_path=''):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                'INSERT INTO courses (title, description, instructor, thumbnail, asset_path) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (title, description, instructor, thumbnail or '', asset_path or ''))
+        self._changed('courses')
+        return int(cur.lastrowid)
+
+    def delete_course(self, course_id):
+        conn = self._conn()
+        with conn:
+            # enrollments go in the same transaction, so a reused id starts empty
+            conn.execute('DELETE FROM enrollments WHERE course_id = ?', (int(course_id),))
+            cur = conn.execute('DELETE FROM courses WHERE id = ?', (int(course_id),))
+        self._changed('courses', 'enrollments')
+        return cur.rowcount > 0
+
+    def update_course(self, course_id, expected=None, **fields):
+        """Set columns on a course if it still matches expected; return the row dict or None."""
+        cols = [c for c in fields if c in COLUMNS['courses'] and c != 'id']
+        checks = [c for c in (expected or {}) if c in COLUMNS['courses']]
+        if not cols:
+            return None
+        where = ' AND '.join(['id = ?'] + [f"COALESCE({c}, '') = ?" for c in checks])
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f'UPDATE courses SET {", ".join(f"{c} = ?" for c in cols)} WHERE {where}',
+                [fields[c] for c in cols] + [int(course_id)] + [str(expected[c]) for c in checks])
+            row = conn.execute('SELECT * FROM courses WHERE id = ?', (int(course_id),)).fetchone()
+        self._changed('courses')
+        return dict(row) if cur.rowcount > 0 and row is not None else None
+
+    # -------------------------
+    # Users
+    # -------------------------
+    def find_user(self, username):
+        """Return the user row for username as a dict, or None."""
+        row = self._conn().execute(
+            'SELECT id, username, password, role FROM users WHERE username = ? LIMIT 1',
+            (str(username),)).fetchone()
+        return dict(row) if row is not None else None
+
+    def add_user(self, username, password, role='student'):
+        """Insert a user; return the new id, or None if the username is taken."""
+        conn = self._conn()
+        with conn:
+            exists = conn.execute(
+                'SELECT 1 FROM users WHERE username = ? LIMIT 1', (username,)).fetchone()
+            if exists:
+                return None
+            try:
+                cur = conn.execute(
+                    'INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
+                    (username, password, role))
+            except sqlite3.IntegrityError:
+                # a concurrent registration won the race for this name
+                return None
+        self._changed('users')
+        return int(cur.lastrowid)
+
+    def update_user(self, username, **fields):
+        """Set the given columns on a user row; return True if it existed."""
+        cols = [c for c in fields if c in COLUMNS['users'] and c != 'id']
+        if not cols:
+            return False
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f'UPDATE users SET {", ".join(f"{c} = ?" for c in cols)} WHERE username = ?',
+                [fields[c] for c in cols] + [str(username)])
+        self._changed('users')
+        return cur.rowcount > 0
+
+    # -------------------------
+    # Enrollments
+    # -------------------------
+    def enroll_user(self, user_id, course_id):
+        """Insert an enrollment; return its id, or None if it already exists."""
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                'INSERT INTO enrollments (user_id, course_id) SELECT ?, ? WHERE NOT EXISTS '
+                '(SELECT 1 FROM enrollments WHERE user_id = ? AND course_id = ?)',
+                (int(user_id), int(course_id), int(user_id), int(course_id)))
+            if cur.rowcount == 0:
+                return None
+        self._changed('enrollments')
+        return int(cur.lastrowid)
+
+    def my_courses(self, user_id):
+        """Courses the user is enrolled in, via the (user_id, course_id) index."""
+        cols = ', '.join(f'c.{c}' for c in COLUMNS['courses'])
+        return pd.read_sql_query(
+            f'SELECT {cols} FROM courses c WHERE c.id IN '
+            '(SELECT course_id FROM enrollments WHERE user_id = ?) ORDER BY c.id',
+            self._conn(), params=(int(user_id),))
+
+    # -------------------------
+    # One-shot CSV import
+    # -------------------------
+    def is_empty(self):
+        conn = self._conn()
+        return not any(conn.execute(f'SELECT 1 FROM {name} LIMIT 1').fetchone()
+                       for name in COLUMNS)
+
+    def import_csv(self, courses_csv, users_csv, enrollments_csv):
+        """Load the three CSV files into the database, replacing its contents.
+
+        Returns a dict of table name -> imported row count.
+        """
+        counts = {}
+        for name, path in (('courses', courses_csv), ('users', users_csv),
+                           ('enrollments', enrollments_csv)):
+            try:
+                df = pd.read_csv(path)
+            except Exception:
+                df = pd.DataFrame(columns=COLUMNS[name])
+            if name == 'enrollments' and not df.empty:
+                # skip torn or blank lines left in the append log
+                df = df[COLUMNS[name]].apply(pd.to_numeric, errors='coerce').dropna()
+            self.replace_table(name, df)
+            counts[name] = len(df)
+        return counts
@@ -0,0 +1,134 @@
+# utils/styles.py
+"""
+The app's global stylesheet, served as one versioned, cacheable file.
+
+APP_CSS merges the stylesheets of utils/ui.py and
+e-learning-streamlit-fixed/utils/ui.py. It is minified once at import and
+written to static/css/app.<hash>.css, which is registered as a component
+directory so Streamlit serves it as text/css with "Cache-Control: public"
+(the app/static route serves .css as text/plain, which browsers refuse).
+
+Streamlit removes any element a rerun does not emit again, so the page
+still has to send *something* every rerun -- but now that is a ~100 byte
+<link> the browser resolves from its cache, instead of the whole <style>
+block. Without a Streamlit server (bare mode, tests) the minified CSS is
+inlined instead.
+"""
+import re
+import hashlib
+from pathlib import Path
+
+CSS_DIR = Path("static") / "css"
+COMPONENT_NAME = "app_css"
+
+APP_CSS = """
+/* Page background & base font */
+body, .stApp {
+    background: #F7FAFC !important;
+    color: #0F172A !important;
+    font-family: Inter, ui-sans-serif, system-ui, -apple-system, "Segoe UI", Roboto, Arial, sans-serif;
+}
+
+/* Topbar */
+.topbar {
+    display: flex; justify-content: space-between; align-items: center;
+    padding: 12px 20px; margin-bottom: 16px;
+    border-bottom: 1px solid rgba(15,23,42,0.06);
+    background: linear-gradient(90deg, rgba(37,99,235,0.03), rgba(6,182,212,0.02));
+}
+.topbar-left { display: flex; gap: 12px; align-items: center; }
+.app-title { font-weight: 800; font-size: 20px; margin: 0; color: #0F172A; }
+.app-sub { color: #475569; font-size: 12px; margin: 0; }
+
+/* Avatar */
+.avatar {
+    width: 36px; height: 36px; border-radius: 8px;
+    display: inline-flex; align-items: center; justify-content: center;
+    background: linear-gradient(135deg, #06B6D4, #2563EB); color: white; font-weight: 700;
+    box-shadow: 0 6px 18px rgba(37,99,235,0.08);
+}
+
+/* Course card */
+.course-card {
+    padding: 14px; border-radius: 12px;
+    background: linear-gradient(180deg, #FFFFFF, #FBFDFF);
+    border: 1px solid rgba(15,23,42,0.04);
+    box-shadow: 0 6px 18px rgba(2,6,23,0.02);
+    height: 100%; display: flex; flex-direction: column; justify-content: space-between;
+}
+.course-title { font-size: 16px; font-weight: 700; color: #0F172A; margin-bottom: 6px; }
+.course-desc { color: #475569; font-size: 13px; margin-bottom: 12px; min-height: 44px; }
+.card-footer { display: flex; justify-content: space-between; align-items: center; }
+
+/* Badges */
+.badge {
+    display: inline-block; padding: 6px 10px; border-radius: 999px;
+    font-size: 12px; font-weight: 700; color: white; margin-left: 6px;
+}
+.badge-new { background: #10B981; }
+.badge-pop { background: #F97316; }
+
+/* Buttons & inputs */
+.stButton button {
+    background: linear-gradient(180deg, #2563EB, #0B5ED7) !important;
+    color: white !important; border-radius: 10px !important;
+    padding: 8px 12px !important; font-weight: 700 !important; box-shadow: none !important;
+}
+.stTextInput>div>div>input, .stTextArea>div>div>textarea {
+    border-radius: 8px !important;
+    border: 1px solid rgba(15,23,42,0.06) !important;
+}
+
+/* Course grid (utils.ui.course_grid_html) */
+.course-grid { display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); gap: 24px; margin-bottom: 16px; }
+.course-cell { display: flex; flex-direction: column; gap: 8px; }
+.card-links a { margin-right: 12px; font-size: 14px; }
+@media (max-width: 900px) { .course-grid { grid-template-columns: 1fr; } }
+"""
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+MINIFIED_CSS = minify_css(APP_CSS)
+CSS_VERSION = hashlib.sha256(MINIFIED_CSS.encode("utf-8")).hexdigest()[:10]
+CSS_FILE = f"app.{CSS_VERSION}.css"
+
+_registered = []    # component name once declared in this process
+
+
+def _write_css_file():
+    target = CSS_DIR / CSS_FILE
+    if not target.exists():
+        CSS_DIR.mkdir(parents=True, exist_ok=True)
+        from utils.write_coordinator import atomic_write_text
+        atomic_write_text(target, MINIFIED_CSS)
+    return CSS_DIR.resolve()
+
+
+def _component_name():
+    """Register static/css as a component directory (once); None without a server."""
+    if _registered:
+        return _registered[0]
+    try:
+        from streamlit.runtime import exists as runtime_exists
+        if not runtime_exists():
+            return None
+        import streamlit.components.v1 as components
+        component = components.declare_component(COMPONENT_NAME, path=str(_write_css_file()))
+        _registered.append(component.name)
+        return component.name
+    except Exception:
+        return None
+
+
+def style_html():
+    """What set_logo_and_style() emits each rerun: a cached <link>, or inline CSS."""
+    name = _component_name()
+    if name is None:
+        return f"<style>{MINIFIED_CSS}</style>"
+    return f'<link rel="stylesheet" href="component/{name}/{CSS_FILE}">'
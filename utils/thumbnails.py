@@ -0,0 +1,228 @@
+# utils/thumbnails.py
+"""
+Resized thumbnail derivatives for course cards.
+
+Originals (e.g. 1600px Unsplash JPEGs) are never sent to the browser.
+Each source image is re-encoded once per width in DERIVATIVE_WIDTHS into a
+content-addressed cache under static/thumbs/ ("<sha256 prefix>-<width>.webp",
+JPEG if this Pillow build has no WebP encoder), served by Streamlit's static
+file server. static/thumbs/index.json maps each course's thumbnail value
+(local path or URL) to its content digest so the card renderer can find
+the derivatives without touching the original.
+
+The index is shared with scripts/build_thumbnails.py and other app
+processes: it is re-read when the file changes on disk (checked at most
+every INDEX_CHECK_INTERVAL seconds), and new entries are merged into the
+current file under its lock instead of overwriting it.
+
+Local originals are processed on first use. Remote (http/https)
+thumbnails are downloaded and processed in a background thread, so only
+their first render sends the original.
+
+Pillow is only imported when a derivative actually has to be built.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.write_coordinator import atomic_write_text, table_lock
+
+THUMB_CACHE_DIR = Path("static") / "thumbs"
+THUMB_URL_PREFIX = "app/static/thumbs"
+THUMB_INDEX = THUMB_CACHE_DIR / "index.json"
+DERIVATIVE_WIDTHS = (320, 640)
+QUALITY = 80
+INDEX_CHECK_INTERVAL = 2.0   # seconds between stats of index.json
+FETCH_REMOTE = os.getenv("ELEARN_THUMB_FETCH", "1").strip().lower() not in ("0", "false", "no")
+FETCH_WORKERS = 2
+FETCH_RETRY_AFTER = 600.0    # seconds before a failed download is tried again
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (E-Learning Streamlit Project)"
+}
+
+_lock = threading.Lock()
+_index = {"entries": {}, "sig": None, "checked": None}  # entries: source -> {"digest", "ext"}
+_local_seen = {}       # (path, mtime_ns, size) -> source string already indexed
+_remote = {}           # url -> None while queued / running, failure time after an error
+_fetcher = None
+
+
+def _index_sig():
+    try:
+        st = os.stat(THUMB_INDEX)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_index_file():
+    try:
+        return json.loads(THUMB_INDEX.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _load_index():
+    """The current index (call with _lock held); re-read if the file changed."""
+    now = time.monotonic()
+    if _index["checked"] is None or now - _index["checked"] >= INDEX_CHECK_INTERVAL:
+        _index["checked"] = now
+        sig = _index_sig()
+        if sig != _index["sig"]:
+            _index["entries"] = _read_index_file()
+            _index["sig"] = sig
+    return _index["entries"]
+
+
+def _add_entry(source, entry):
+    """Merge one entry into index.json (call with _lock held)."""
+    if _load_index().get(source) == entry:
+        return
+    with table_lock(THUMB_INDEX):
+        entries = _read_index_file()
+        entries[source] = entry
+        atomic_write_text(THUMB_INDEX, json.dumps(entries, indent=0, sort_keys=True))
+        _index.update(entries=entries, sig=_index_sig(), checked=time.monotonic())
+
+
+def _encoder():
+    from PIL import features
+    return ("webp", "WEBP") if features.check("webp") else ("jpg", "JPEG")
+
+
+def _derivative_path(digest, width, ext):
+    return THUMB_CACHE_DIR / f"{digest}-{width}.{ext}"
+
+# -------------------------
+# Building derivatives
+# -------------------------
+
+
+def make_derivatives(data, source=None):
+    """
+    Build every derivative width for the given image bytes (skipping ones
+    already in the cache) and, if source is given, index it under that
+    thumbnail value. Returns {width: local path}.
+    """
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    ext, fmt = _encoder()
+    THUMB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    paths = {w: _derivative_path(digest, w, ext) for w in DERIVATIVE_WIDTHS}
+    missing = [w for w, p in paths.items() if not p.exists()]
+    if missing:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            for w in missing:
+                copy = img.copy()
+                if copy.width > w:
+                    copy = copy.resize((w, max(1, round(copy.height * w / copy.width))),
+                                       Image.LANCZOS)
+                tmp = paths[w].with_name(f".{paths[w].name}.{os.getpid()}.tmp")
+                if fmt == "WEBP":
+                    copy.save(tmp, fmt, quality=QUALITY, method=4)
+                else:
+                    copy.save(tmp, fmt, quality=QUALITY, optimize=True, progressive=True)
+                os.replace(tmp, paths[w])
+    if source:
+        with _lock:
+            _add_entry(str(source), {"digest": digest, "ext": ext})
+    return paths
+
+
+def make_derivatives_for_file(path, source=None):
+    with open(path, "rb") as f:
+        return make_derivatives(f.read(), source=source or str(path))
+
+
+def fetch_remote(url, timeout=30):
+    """Download a remote thumbnail; returns its bytes."""
+    import requests
+
+    resp = requests.get(url, headers=HEADERS, timeout=timeout)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _build_remote(url):
+    try:
+        make_derivatives(fetch_remote(url), source=url)
+    except Exception:
+        with _lock:
+            _remote[url] = time.monotonic()
+        return
+    with _lock:
+        _remote.pop(url, None)
+
+
+def _queue_remote(url):
+    """Build derivatives for a remote thumbnail in the background (once)."""
+    global _fetcher
+    with _lock:
+        failed_at = _remote.get(url, False)
+        if failed_at is None or (failed_at and time.monotonic() - failed_at < FETCH_RETRY_AFTER):
+            return
+        _remote[url] = None
+        if _fetcher is None:
+            _fetcher = ThreadPoolExecutor(max_workers=FETCH_WORKERS,
+                                          thread_name_prefix="thumb-fetch")
+    _fetcher.submit(_build_remote, url)
+
+# -------------------------
+# Lookup for the card renderer
+# -------------------------
+
+
+def derivative_key(thumbnail):
+    """The index entry's digest for a thumbnail value, or None (cheap; for cache keys)."""
+    if not thumbnail or not isinstance(thumbnail, str):
+        return None
+    with _lock:
+        entry = _load_index().get(thumbnail)
+    return entry["digest"] if entry else None
+
+
+def derivative_urls(thumbnail, build_local=True):
+    """
+    Return {width: static URL} for a course thumbnail value, or None if no
+    derivatives exist yet. When build_local is set, local originals are
+    processed on first use (once per file version) and remote ones are
+    queued for a background build.
+    """
+    if not thumbnail or not isinstance(thumbnail, str) or thumbnail.startswith("data:"):
+        return None
+    with _lock:
+        entry = _load_index().get(thumbnail)
+    if entry is None and build_local and thumbnail.startswith(("http://", "https://")):
+        if FETCH_REMOTE:
+            _queue_remote(thumbnail)
+        return None
+    if entry is None and build_local:
+        try:
+            st = os.stat(thumbnail)
+        except (OSError, ValueError):
+            return None
+        key = (thumbnail, st.st_mtime_ns, st.st_size)
+        if key in _local_seen:
+            return None
+        _local_seen[key] = thumbnail
+        try:
+            make_derivatives_for_file(thumbnail, source=thumbnail)
+        except Exception:
+            return None
+        with _lock:
+            entry = _load_index().get(thumbnail)
+    if entry is None:
+        return None
+    urls = {}
+    for w in DERIVATIVE_WIDTHS:
+        p = _derivative_path(entry["digest"], w, entry["ext"])
+        if p.exists():
+            urls[w] = f"{THUMB_URL_PREFIX}/{p.name}"
+    return urls or None
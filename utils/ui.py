@@ -1,32 +1,18 @@
 ﻿# utils/ui.py
 import streamlit as st
 import html
+import os
 from pathlib import Path
 
+from utils import assets, metrics, thumbnails, render, styles
+
 # Optional default thumbnail (data URL or remote image); leave empty to disable
 DEFAULT_THUMBNAIL = "https://img.icons8.com/fluency/240/000000/open-book.png"
 
 
 def set_logo_and_style():
-    """Inject CSS for global app look and topbar."""
-    st.markdown(
-        """
-        <style>
-        body, .stApp { background: #F7FAFC !important; color: #0F172A !important; font-family: Inter, Arial, sans-serif; }
-        .topbar { display:flex; justify-content:space-between; align-items:center; padding:12px 20px; border-bottom:1px solid rgba(15,23,42,0.06); margin-bottom:16px; background: linear-gradient(90deg, rgba(37,99,235,0.03), rgba(6,182,212,0.02)); }
-        .app-title { font-weight:800; font-size:20px; margin:0; color:#0F172A; }
-        .avatar { width:36px; height:36px; border-radius:8px; display:inline-flex; align-items:center; justify-content:center; background:linear-gradient(135deg,#06B6D4,#2563EB); color:white; font-weight:700; }
-        .course-card { padding:14px; border-radius:12px; background:#fff; border:1px solid rgba(15,23,42,0.04); box-shadow:0 6px 18px rgba(2,6,23,0.02); }
-        .course-title { font-size:16px; font-weight:700; color:#0F172A; margin-bottom:6px; }
-        .course-desc { color:#475569; font-size:13px; margin-bottom:12px; min-height:44px; }
-        .badge { display:inline-block; padding:6px 10px; border-radius:999px; font-size:12px; font-weight:700; color:white; margin-left:6px; }
-        .badge-new { background:#10B981; } .badge-pop { background:#F97316; }
-        .stButton button { background: linear-gradient(180deg,#2563EB,#0B5ED7) !important; color:white !important; border-radius:10px !important; padding:8px 12px !important; font-weight:700 !important; }
-        .stTextInput>div>div>input, .stTextArea>div>div>textarea { border-radius:8px !important; border:1px solid rgba(15,23,42,0.06) !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    """Inject the global stylesheet (utils/styles.py): a cached <link> per rerun."""
+    st.markdown(styles.style_html(), unsafe_allow_html=True)
 
 
 def _coerce_to_str(x):
@@ -60,11 +46,10 @@ def _choose_thumbnail_src(thumb_candidate: str):
     """
     if not thumb_candidate:
         return DEFAULT_THUMBNAIL or ""
-    # prefer local files if they exist
+    # prefer local files if they exist (existence cached briefly)
     try:
-        p = Path(thumb_candidate)
-        if p.exists():
-            return str(p.as_posix())
+        if render.local_file_exists(thumb_candidate):
+            return str(Path(thumb_candidate).as_posix())
     except Exception:
         pass
     return thumb_candidate
@@ -76,13 +61,21 @@ def course_card_html(title, description, thumbnail_url=None, badges_html=""):
     Safely handles thumbnail values that may be float('nan') from CSVs.
     """
     t = html.escape("" if title is None else str(title))
-    d = html.escape("" if description is None else str(description))
+    # line breaks as <br>: the card may be compacted onto one line (see _compact)
+    d = "<br>".join(html.escape(line.strip())
+                    for line in ("" if description is None else str(description)).splitlines())
 
     thumb_raw = _coerce_to_str(thumbnail_url)
     thumb_src = _choose_thumbnail_src(thumb_raw)
 
     thumb_tag = ""
-    if thumb_src:
+    # prefer resized derivatives (utils/thumbnails.py) over the original
+    derivs = thumbnails.derivative_urls(thumb_raw)
+    if derivs:
+        widths = sorted(derivs)
+        srcset = ", ".join(f"{html.escape(derivs[w])} {w}w" for w in widths)
+        thumb_tag = f'<div style="margin-bottom:10px"><img src="{html.escape(derivs[widths[0]])}" srcset="{srcset}" sizes="(max-width: 640px) 100vw, 420px" loading="lazy" style="width:100%;border-radius:8px;object-fit:cover;max-height:160px" /></div>'
+    elif thumb_src:
         thumb_tag = f'<div style="margin-bottom:10px"><img src="{html.escape(thumb_src)}" style="width:100%;border-radius:8px;object-fit:cover;max-height:160px" /></div>'
 
     html_block = f"""
@@ -127,3 +120,77 @@ def topbar_html(username=None):
     </div>
     """
     return html_block
+
+
+def _static_serving_enabled():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def asset_links_html(asset, open_label="🔗 Open"):
+    """
+    Download / Open links for a course asset as one HTML snippet.
+    Returns "" when there is no asset, or None when the asset is a local
+    file that needs a widget (static serving is off).
+    """
+    if not asset or not isinstance(asset, str) or not asset.strip():
+        return ""
+    name = html.escape(assets.download_name(asset))
+    if not assets.is_local_asset(asset):
+        # assume it's a URL (Backblaze; the object carries the name as Content-Disposition)
+        url = html.escape(asset)
+        return (f'<a href="{url}" download="{name}">📥 Download</a>'
+                f' &nbsp; <a href="{url}" target="_blank">🔗 Open in new tab</a>')
+    if not _static_serving_enabled():
+        return None
+    url = html.escape(assets.static_url(asset))
+    return (f'<a href="{url}" download="{name}">📥 Download PDF</a>'
+            f' &nbsp; <a href="{url}" target="_blank">{open_label}</a>')
+
+
+def asset_actions(asset, key, open_label="🔗 Open"):
+    """
+    Render Download / Open links for a course asset (local path or URL).
+    Local files are linked through Streamlit's static file server, so the
+    PDF is never read or base64-encoded during a rerun. If static serving is
+    off, the bytes are read (through the asset LRU) only after the user asks.
+    """
+    links = asset_links_html(asset, open_label)
+    if links:
+        st.markdown(links, unsafe_allow_html=True)
+        return
+    if links == "":
+        return
+
+    name = assets.download_name(asset)
+    ready_key = f"{key}-ready"
+    if st.session_state.get(ready_key):
+        st.download_button("📥 Download PDF", data=assets.read_asset(asset), file_name=name,
+                           mime="application/pdf", key=key)
+    elif st.button("📥 Prepare download", key=f"{key}-prep"):
+        st.session_state[ready_key] = True
+        st.rerun()
+
+
+def _compact(fragment):
+    # one line per block: no blank lines to end the markdown HTML block early
+    return "".join(line.strip() for line in fragment.splitlines())
+
+
+@metrics.timed("render.grid")
+def course_grid_html(cells):
+    """
+    One HTML block for a whole page of cards. cells is a list of
+    (card_html, links_html) pairs; links_html may be empty.
+    """
+    parts = ['<div class="course-grid">']
+    for card, links in cells:
+        parts.append('<div class="course-cell">')
+        parts.append(_compact(card))
+        if links:
+            parts.append(f'<div class="card-links">{links}</div>')
+        parts.append('</div>')
+    parts.append('</div>')
+    return "".join(parts)
@@ -0,0 +1,258 @@
+# utils/upload_queue.py
+"""
+Background upload of course assets to Backblaze B2.
+
+The admin page stages each uploaded file to assets/uploads (local disk, no
+network, content-addressed by SHA-256) and saves the course pointing at
+that local path, so the request returns immediately and the course is
+usable right away. A daemon worker
+thread then uploads staged files to B2, retrying with exponential backoff,
+and on success swaps the course's thumbnail/asset_path to the remote URL
+(only if the column still holds the staged path, so later edits win).
+
+Pending jobs are persisted to data/upload_queue.json and resumed on the
+next start (the warm start in utils/warmup.py calls resume_pending). If B2 is not configured the jobs end up 'failed' and the course
+simply keeps serving its local copy.
+"""
+import os
+import json
+import time
+import uuid
+import random
+import hashlib
+import threading
+from pathlib import Path
+
+from utils.write_coordinator import atomic_write_text
+
+STAGING_DIR = Path("assets") / "uploads"
+QUEUE_FILE = Path("data") / "upload_queue.json"
+
+MAX_ATTEMPTS = int(os.getenv("ELEARN_UPLOAD_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = float(os.getenv("ELEARN_UPLOAD_BACKOFF", "2.0"))   # seconds, doubled per attempt
+BACKOFF_MAX = 300.0
+KEEP_FINISHED = 50      # finished jobs kept for the status panel
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_jobs = None            # job id -> job dict
+_worker = None
+
+# -------------------------
+# Staging (request thread)
+# -------------------------
+
+
+def stage_file(file_obj, name):
+    """
+    Write an uploaded file under assets/uploads as "<sha256><ext>" (hashed
+    while streaming) and return its local path. Identical bytes are stored
+    once, whatever they were called; the original name is kept in the blob
+    index as the download name (see assets.download_name).
+    """
+    from utils.data_io import record_blob
+
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STAGING_DIR / f".{uuid.uuid4().hex}.tmp"
+    h = hashlib.sha256()
+    size = 0
+    try:
+        file_obj.seek(0)
+    except Exception:
+        pass
+    try:
+        with open(tmp, "wb") as f:
+            while True:
+                chunk = file_obj.read(1024 * 1024)
+                if not chunk:
+                    break
+                h.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        digest = h.hexdigest()
+        target = STAGING_DIR / f"{digest}{Path(str(name)).suffix.lower()}"
+        if target.exists() and target.stat().st_size == size:
+            record_blob(digest, size, local=target.as_posix(), hit="local",
+                        name=Path(str(name)).name)
+            return target.as_posix()
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    record_blob(digest, size, local=target.as_posix(), name=Path(str(name)).name)
+    return target.as_posix()
+
+
+def _load():
+    global _jobs
+    if _jobs is None:
+        try:
+            _jobs = json.loads(QUEUE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            _jobs = {}
+        for job in _jobs.values():
+            if job["status"] == "uploading":   # interrupted by a restart
+                job["status"] = "pending"
+    return _jobs
+
+
+def _save():
+    finished = sorted((j for j in _jobs.values() if j["status"] in ("done", "failed")),
+                      key=lambda j: j["updated"])
+    for job in finished[:-KEEP_FINISHED] if len(finished) > KEEP_FINISHED else ():
+        _jobs.pop(job["id"], None)
+    atomic_write_text(QUEUE_FILE, json.dumps(_jobs, indent=1, sort_keys=True))
+
+
+def enqueue(course_id, column, local_path, key):
+    """Queue local_path for upload to B2 as key; on success course.column gets the URL."""
+    now = time.time()
+    job = {"id": uuid.uuid4().hex[:12], "course_id": int(course_id), "column": column,
+           "local_path": str(local_path), "key": key, "status": "pending",
+           "attempts": 0, "next_try": now, "created": now, "updated": now,
+           "error": None, "url": None, "stats": None}
+    with _lock:
+        _load()[job["id"]] = job
+        _save()
+    start_worker()
+    _wakeup.set()
+    return job["id"]
+
+# -------------------------
+# Worker
+# -------------------------
+
+
+def _backoff(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _next_due():
+    with _lock:
+        now = time.time()
+        pending = [j for j in _load().values() if j["status"] == "pending"]
+        due = [j for j in pending if j["next_try"] <= now]
+        if due:
+            job = min(due, key=lambda j: j["next_try"])
+            job["status"] = "uploading"
+            job["updated"] = now
+            return dict(job), None
+        wait = min((j["next_try"] for j in pending), default=None)
+        return None, (wait - now if wait is not None else None)
+
+
+def _finish(job_id, **changes):
+    with _lock:
+        job = _load().get(job_id)
+        if job is None:
+            return
+        job.update(changes, updated=time.time())
+        _save()
+
+
+def _process(job):
+    from utils import backblaze
+    from utils.data_io import update_course
+
+    stats = {}   # bytes / seconds / mb_per_s of the transfer, or dedup=...
+    try:
+        url = backblaze.upload_path(job["local_path"], job["key"], stats=stats)
+    except Exception as e:
+        attempts = job["attempts"] + 1
+        if attempts >= MAX_ATTEMPTS or not os.path.exists(job["local_path"]):
+            _finish(job["id"], status="failed", attempts=attempts, error=str(e)[:300],
+                    stats=stats or None)
+        else:
+            _finish(job["id"], status="pending", attempts=attempts, error=str(e)[:300],
+                    stats=stats or None, next_try=time.time() + _backoff(attempts))
+        return
+
+    if job["column"] == "thumbnail":
+        # index the staged file's derivatives under the URL before the swap,
+        # so no card is ever rendered (and cached) with the full-size remote
+        # original in between
+        try:
+            from utils.thumbnails import make_derivatives_for_file
+            make_derivatives_for_file(job["local_path"], source=url)
+        except Exception:
+            pass
+
+    swapped = False
+    try:
+        swapped = update_course(job["course_id"], expected={job["column"]: job["local_path"]},
+                                **{job["column"]: url})
+    except Exception as e:
+        _finish(job["id"], status="done", attempts=job["attempts"] + 1, url=url, stats=stats,
+                error=f"uploaded, but course update failed: {e}"[:300])
+        return
+    _finish(job["id"], status="done", attempts=job["attempts"] + 1, url=url, stats=stats,
+            error=None if swapped else "course changed meanwhile; kept its current value")
+
+
+def _run():
+    while True:
+        job, wait = _next_due()
+        if job is not None:
+            _process(job)
+            continue
+        _wakeup.wait(timeout=wait if wait is not None else 60)
+        _wakeup.clear()
+
+
+def start_worker():
+    """Start the daemon upload thread once per process (resumes saved jobs)."""
+    global _worker
+    with _lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _load()
+        _worker = threading.Thread(target=_run, name="b2-upload-queue", daemon=True)
+        _worker.start()
+
+
+def resume_pending():
+    """Start the worker if the saved queue has unfinished jobs; return how many."""
+    with _lock:
+        unfinished = sum(1 for j in _load().values() if j["status"] in ("pending", "uploading"))
+    if unfinished:
+        start_worker()
+    return unfinished
+
+
+def retry_failed():
+    """Put every failed job back in the queue."""
+    with _lock:
+        for job in _load().values():
+            if job["status"] == "failed":
+                job.update(status="pending", attempts=0, next_try=time.time())
+        _save()
+    start_worker()
+    _wakeup.set()
+
+
+def queue_status():
+    """
+    Counts by status, the job list (newest first) and the throughput of
+    the finished transfers still listed: {"bytes", "seconds", "mb_per_s",
+    "transfers", "skipped"} (skipped = dedup hits, nothing sent).
+    """
+    with _lock:
+        jobs = sorted((dict(j) for j in _load().values()),
+                      key=lambda j: j["created"], reverse=True)
+    counts = {"pending": 0, "uploading": 0, "done": 0, "failed": 0}
+    throughput = {"bytes": 0, "seconds": 0.0, "mb_per_s": None, "transfers": 0, "skipped": 0}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+        stats = job.get("stats") or {}
+        if job["status"] != "done":
+            continue
+        if stats.get("dedup"):
+            throughput["skipped"] += 1
+        elif stats.get("seconds"):
+            throughput["transfers"] += 1
+            throughput["bytes"] += stats.get("bytes") or 0
+            throughput["seconds"] += stats["seconds"]
+    if throughput["seconds"] > 0:
+        throughput["mb_per_s"] = round(throughput["bytes"] / throughput["seconds"] / 1e6, 2)
+    return {"counts": counts, "jobs": jobs, "throughput": throughput}
@@ -0,0 +1,139 @@
+# utils/warmup.py
+"""
+Once-per-process warm start, run by streamlit_app.py on its first script
+run, so later sessions and page switches find everything ready.
+
+streamlit_app.py is re-executed on every rerun, so (like page_registry) the
+state lives in this imported module. run() works in two phases:
+
+  before the first page renders
+    data_files        data_io.ensure_data_files()
+    upload_queue      resume saved background uploads (upload_queue.resume_pending)
+    tables            parse every table into the data_io cache
+    course_records    typed rows the home and catalog pages iterate
+    stylesheet        write/register the versioned CSS file
+    pages             import every page (page_registry.preload)
+  in a background thread, started by start_background() once the first
+  page has rendered
+    search_index, enrollment_index, user_index, popularity
+
+so the first request only pays for what the first page needs and never
+competes with the index builds for the GIL or the data_io lock. Each step
+is timed (report(), the admin Performance panel and "startup.<step>"
+metrics spans). A failing step is logged and skipped; the app builds
+whatever is missing on first use.
+
+ELEARN_WARMUP: 1 (default, as above), sync (all steps before the first
+render) or 0 (only data_files and upload_queue; everything else is built
+lazily).
+"""
+import os
+import time
+import threading
+
+from utils import metrics
+
+MODE = os.getenv("ELEARN_WARMUP", "1").strip().lower()
+ENABLED = MODE not in ("0", "false", "no")
+FOREGROUND_CACHES = ("tables", "course_records")
+BACKGROUND_CACHES = ("search_index", "enrollment_index", "user_index", "popularity")
+
+_lock = threading.Lock()
+_background_started = False
+_report = {}   # {"mode", "total_ms", "steps": {step: ms}, "errors": {step: message}, ...}
+
+
+def _record(steps, name, seconds):
+    steps[name] = round(seconds * 1000, 2)
+    metrics.observe(f"startup.{name}", seconds)
+
+
+def _step(name, fn, steps, errors):
+    t0 = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        errors[name] = str(e)
+        result = None
+    _record(steps, name, time.perf_counter() - t0)
+    return result
+
+
+def _warm_caches(names, steps, errors):
+    from utils import data_io
+
+    try:
+        for name, seconds in data_io.warm_caches(names).items():
+            _record(steps, name, seconds)
+    except Exception as e:
+        errors["caches"] = str(e)
+
+
+def _background():
+    t0 = time.perf_counter()
+    steps, errors = {}, {}
+    _warm_caches(BACKGROUND_CACHES, steps, errors)
+    with _lock:
+        _report["steps"].update(steps)
+        _report["errors"].update(errors)
+        _report["background_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    print(f"Warm start (background): {_report['background_ms']:.0f} ms")
+
+
+def run(page_names=()):
+    """Warm this process once; later calls return the first run's report."""
+    if _report:
+        return _report
+    with _lock:
+        if _report:
+            return _report
+        from utils import data_io, page_registry, upload_queue
+
+        t0 = time.perf_counter()
+        steps, errors = {}, {}
+        _step("data_files", data_io.ensure_data_files, steps, errors)
+        _step("upload_queue", upload_queue.resume_pending, steps, errors)
+        if ENABLED:
+            foreground = FOREGROUND_CACHES
+            if MODE == "sync":
+                foreground += BACKGROUND_CACHES
+            _warm_caches(foreground, steps, errors)
+
+            def stylesheet():
+                from utils import styles
+                styles.style_html()
+
+            _step("stylesheet", stylesheet, steps, errors)
+            failed = _step("pages", lambda: page_registry.preload(page_names), steps, errors)
+            for name, message in (failed or {}).items():
+                errors[f"page {name}"] = message
+
+        total = time.perf_counter() - t0
+        metrics.observe("startup.total", total)
+        _report.update(mode=MODE, total_ms=round(total * 1000, 2), steps=steps,
+                       errors=errors, background_ms=None, finished_at=time.time())
+        if ENABLED:
+            print(f"Warm start: {_report['total_ms']:.0f} ms "
+                  + ", ".join(f"{k}={v:.0f}" for k, v in steps.items())
+                  + (f" (errors: {errors})" if errors else ""))
+        return _report
+
+
+def start_background():
+    """Build the remaining indexes in a daemon thread (once, after run())."""
+    global _background_started
+    if _background_started or not _report or not ENABLED or MODE == "sync":
+        return
+    with _lock:
+        if _background_started:
+            return
+        _background_started = True
+    threading.Thread(target=_background, name="warmup", daemon=True).start()
+
+
+def report():
+    """The warm start breakdown, or {} if run() hasn't finished yet."""
+    with _lock:
+        if not _report:
+            return {}
+        return dict(_report, steps=dict(_report["steps"]), errors=dict(_report["errors"]))
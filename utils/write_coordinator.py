@@ -0,0 +1,234 @@
+# utils/write_coordinator.py
+"""Serialized, atomic, group-committed writes for the CSV tables.
+
+- table_lock(path): one writer per table, across threads (RLock) and
+  processes (OS lock on "<path>.lock").
+- atomic_write_csv(path, df): write a temp file next to the target, fsync
+  it, then os.replace() it into place so readers never see a torn file.
+- commit(...): writers that arrive while a flush is in progress queue up;
+  the next leader applies every queued change to one fresh copy of the
+  table and writes it once (group commit).
+"""
+import os
+import time
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How long a leader waits for more writers to join its batch (seconds).
+GROUP_COMMIT_WINDOW = 0.002
+
+_REGISTRY_LOCK = threading.Lock()
+_locks = {}    # lock path -> [RLock, depth, fd]
+_writers = {}  # table key -> _Writer
+
+# -------------------------
+# OS file locks
+# -------------------------
+
+
+def _os_lock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.01)
+
+
+def _os_unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def table_lock(path):
+    """Hold the exclusive writer lock for a table file (reentrant per thread)."""
+    key = str(Path(path)) + '.lock'
+    with _REGISTRY_LOCK:
+        state = _locks.setdefault(key, [threading.RLock(), 0, None])
+    rlock = state[0]
+    with rlock:
+        if state[1] == 0:
+            Path(key).parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _os_lock(fd)
+            except Exception:
+                os.close(fd)
+                raise
+            state[2] = fd
+        state[1] += 1
+        try:
+            yield
+        finally:
+            state[1] -= 1
+            if state[1] == 0:
+                fd, state[2] = state[2], None
+                try:
+                    _os_unlock(fd)
+                finally:
+                    os.close(fd)
+
+# -------------------------
+# Atomic replace
+# -------------------------
+
+
+def atomic_write_csv(path, df):
+    """Write df to path via temp file + fsync + os.replace."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            df.to_csv(f, index=False, lineterminator='\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_binary(path, write):
+    """Call write(f) on a binary temp file next to path, then fsync + os.replace."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path, text):
+    """Write a small text file via temp file + fsync + os.replace."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+# -------------------------
+# Group commit
+# -------------------------
+
+
+class _Request:
+    __slots__ = ('mutation', 'result', 'error', 'done')
+
+    def __init__(self, mutation):
+        self.mutation = mutation
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class _Writer:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.queue = []
+        self.flushing = False
+        self.batches = 0
+        self.requests = 0
+
+
+def commit(key, path, read, write, mutation):
+    """Apply mutation to a table and persist it, batching concurrent callers.
+
+    - read():        return the current table (must be fresh from disk)
+    - write(df):     persist the table (normally atomic_write_csv)
+    - mutation(df):  return (new_df, result); result is handed back to the caller
+
+    If mutation raises, the table is left as it was for that request and the
+    exception is re-raised in the caller's thread.
+    """
+    with _REGISTRY_LOCK:
+        w = _writers.setdefault(key, _Writer())
+    req = _Request(mutation)
+    with w.cond:
+        w.queue.append(req)
+        while w.flushing and not req.done:
+            w.cond.wait()
+        if req.done:
+            return _finish(req)
+        w.flushing = True
+
+    # We are the leader: let writers arriving right now join this batch.
+    if GROUP_COMMIT_WINDOW:
+        time.sleep(GROUP_COMMIT_WINDOW)
+    with w.cond:
+        batch, w.queue = w.queue, []
+    try:
+        with table_lock(path):
+            df = read()
+            changed = False
+            for r in batch:
+                try:
+                    new, r.result = r.mutation(df)
+                    if new is not df:
+                        df, changed = new, True
+                except Exception as e:
+                    r.error = e
+            if changed:
+                write(df)
+    except Exception as e:
+        for r in batch:
+            if r.error is None:
+                r.error = e
+    finally:
+        with w.cond:
+            for r in batch:
+                r.done = True
+            w.batches += 1
+            w.requests += len(batch)
+            w.flushing = False
+            w.cond.notify_all()
+    return _finish(req)
+
+
+def _finish(req):
+    if req.error is not None:
+        raise req.error
+    return req.result
+
+
+def stats():
+    """Return {table key: {'batches': n, 'requests': n}} for monitoring."""
+    with _REGISTRY_LOCK:
+        return {k: {'batches': w.batches, 'requests': w.requests}
+                for k, w in _writers.items()}